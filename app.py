@@ -3,12 +3,15 @@ from pages.register_page import show_register_page
 from pages.dashboard import show_dashboard
 from navbar import render_top_navbar
 from pages.portfolio_page import show_add_assets_page   
+from resources import get_precompute_scheduler
 
 st.set_page_config(page_title="Mein Finanz-Dashboard", layout="wide", initial_sidebar_state="expanded")
 
 def main():
 
     st.title("Finanzen")
+    # startet beim ersten Aufruf die Vorberechnung im Hintergrund (einmal pro Prozess)
+    get_precompute_scheduler()
     if "selected_symbol" not in st.session_state:
         st.session_state["selected_symbol"] = None
     if "data" not in st.session_state:
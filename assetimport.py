@@ -0,0 +1,202 @@
+import csv
+import re
+from datetime import datetime
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+# Spaltennamen aus gängigen Broker-Exporten -> interne Namen
+COLUMN_ALIASES = {
+    "symbol": "symbol",
+    "ticker": "symbol",
+    "amount": "amount",
+    "quantity": "amount",
+    "shares": "amount",
+    "menge": "amount",
+    "anzahl": "amount",
+    "stück": "amount",
+    "buy_price": "buy_price",
+    "price": "buy_price",
+    "preis": "buy_price",
+    "kaufpreis": "buy_price",
+    "kurs": "buy_price",
+    "bought_at": "bought_at",
+    "date": "bought_at",
+    "datum": "bought_at",
+    "kaufdatum": "bought_at",
+    "asset_type": "asset_type",
+    "type": "asset_type",
+    "typ": "asset_type",
+    "asset_name": "asset_name",
+    "name": "asset_name",
+    "currency": "currency",
+    "währung": "currency",
+    "waehrung": "currency",
+}
+
+REQUIRED_COLUMNS = ("symbol", "amount", "buy_price", "bought_at")
+
+# Dezimaltrennzeichen: "auto" leitet es aus dem Spaltentrenner ab (";" -> ",", sonst ".")
+DECIMAL_SEPARATORS = ("auto", ",", ".")
+# Reihenfolge bei Datumsangaben mit "/" bzw. "-" (TT/MM/JJJJ oder MM/TT/JJJJ); "auto" erkennt sie pro Datei
+DATE_ORDERS = ("auto", "dmy", "mdy")
+
+_ISO_DATE = re.compile(r"^(\d{4})[-/](\d{1,2})[-/](\d{1,2})$")
+_GERMAN_DATE = re.compile(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})$")
+_SLASH_DATE = re.compile(r"^(\d{1,2})[/-](\d{1,2})[/-](\d{4})$")
+
+# (asset_type, asset_symbol, asset_name, amount, buy_price, bought_at, currency, line_no)
+ImportRow = Tuple[str, str, Optional[str], float, float, str, str, int]
+RowError = Tuple[int, str]
+
+
+def infer_asset_type(symbol: str, quote_type: str | None = None) -> str:
+    if quote_type:
+        qt = quote_type.lower()
+        if "crypto" in qt or qt == "cryptocurrency":
+            return "crypto"
+        if qt in ("equity", "etf", "mutualfund", "index", "fund"):
+            return "stock"
+
+    s = symbol.upper()
+    crypto_suffixes = ("-USD", "-USDT", "-EUR", "-BTC")
+    if s.endswith(crypto_suffixes):
+        return "crypto"
+    common_crypto = {"BTC", "ETH", "SOL", "XRP", "ADA", "DOGE"}
+    if s in common_crypto:
+        return "crypto"
+    return "stock"
+
+
+def _parse_number(value: str, decimal: str = ".") -> float:
+    """
+    Zahl mit festem Dezimaltrennzeichen; das jeweils andere Zeichen ist nur als
+    Tausendertrenner in Dreiergruppen erlaubt (1.234,56 bzw. 1,234.56).
+    """
+    value = value.strip().replace(" ", "")
+    thousands = "." if decimal == "," else ","
+    pattern = rf"^[+-]?(\d+|\d{{1,3}}(\{thousands}\d{{3}})+)(\{decimal}\d+)?$"
+    if not re.match(pattern, value):
+        raise ValueError(f"ungültige Zahl für Dezimaltrennzeichen '{decimal}': {value!r}")
+    return float(value.replace(thousands, "").replace(decimal, "."))
+
+
+class _DateParser:
+    """
+    Parses ISO (JJJJ-MM-TT), German (TT.MM.JJJJ) and slash dates. The order of
+    slash dates is given or, with "auto", taken from the first unambiguous date
+    of the file (a part > 12); ambiguous dates before that are rejected.
+    """
+
+    def __init__(self, order: str = "auto") -> None:
+        if order not in DATE_ORDERS:
+            raise ValueError(f"unbekannte Datumsreihenfolge: {order!r}")
+        self.order = None if order == "auto" else order
+        self.fixed = order != "auto"
+
+    def __call__(self, value: str) -> str:
+        value = value.strip()[:10]
+        if match := _ISO_DATE.match(value):
+            year, month, day = match.groups()
+        elif match := _GERMAN_DATE.match(value):
+            day, month, year = match.groups()
+        elif match := _SLASH_DATE.match(value):
+            first, second, year = match.groups()
+            day, month = self._slash_order(int(first), int(second), value)
+        else:
+            raise ValueError(f"unbekanntes Datumsformat: {value!r}")
+        return self._format(year, month, day, value)
+
+    def _slash_order(self, first: int, second: int, value: str) -> Tuple[int, int]:
+        detected = "dmy" if first > 12 else "mdy" if second > 12 else None
+        if detected and self.order and detected != self.order:
+            expected = "TT/MM/JJJJ" if self.order == "dmy" else "MM/TT/JJJJ"
+            raise ValueError(f"Datum {value!r} passt nicht zum Format {expected}")
+        if self.order is None:
+            if detected is None and first != second:
+                raise ValueError(f"mehrdeutiges Datum {value!r}: bitte Datumsformat wählen")
+            self.order = detected
+        order = self.order or "dmy"   # z.B. 05/05/2024
+        return (first, second) if order == "dmy" else (second, first)
+
+    @staticmethod
+    def _format(year, month, day, value: str) -> str:
+        try:
+            return datetime(int(year), int(month), int(day)).strftime("%Y-%m-%d")
+        except ValueError:
+            raise ValueError(f"ungültiges Datum: {value!r}")
+
+
+def _detect_delimiter(header_line: str) -> str:
+    return max((";", ",", "\t"), key=header_line.count)
+
+
+def iter_asset_chunks(
+    stream: TextIO,
+    chunk_size: int = 1000,
+    decimal: str = "auto",
+    date_order: str = "auto",
+) -> Iterator[Tuple[List[ImportRow], List[RowError]]]:
+    """
+    Reads a transaction CSV line by line and yields (rows, errors) per chunk
+    of at most ``chunk_size`` lines, so memory stays bounded for large files.
+
+    Required columns: symbol, amount, buy_price, bought_at (or the aliases in
+    COLUMN_ALIASES). Optional: asset_type, asset_name, currency (default EUR).
+    ``decimal`` and ``date_order`` see DECIMAL_SEPARATORS and DATE_ORDERS.
+    """
+    if decimal not in DECIMAL_SEPARATORS:
+        raise ValueError(f"unbekanntes Dezimaltrennzeichen: {decimal!r}")
+    parse_date = _DateParser(date_order)
+
+    header_line = stream.readline()
+    if not header_line:
+        return
+
+    delimiter = _detect_delimiter(header_line)
+    if decimal == "auto":
+        decimal = "," if delimiter == ";" else "."
+    header = next(csv.reader([header_line], delimiter=delimiter))
+    columns = [COLUMN_ALIASES.get(name.strip().lower()) for name in header]
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"Pflichtspalten fehlen: {', '.join(missing)}")
+
+    position = {name: columns.index(name) for name in set(columns) if name}
+
+    rows: List[ImportRow] = []
+    errors: List[RowError] = []
+    lines_in_chunk = 0
+
+    reader = csv.reader(stream, delimiter=delimiter)
+    for record in reader:
+        if not any(value.strip() for value in record):
+            continue
+
+        # +1, weil der Header bereits vorher gelesen wurde
+        line_no = reader.line_num + 1
+        values = {name: record[idx].strip() for name, idx in position.items() if idx < len(record)}
+
+        try:
+            symbol = values.get("symbol", "").upper()
+            if not symbol:
+                raise ValueError("Symbol fehlt")
+            amount = _parse_number(values.get("amount", ""), decimal)
+            buy_price = _parse_number(values.get("buy_price", ""), decimal)
+            if amount <= 0 or buy_price <= 0:
+                raise ValueError("Menge und Preis müssen größer 0 sein")
+            bought_at = parse_date(values.get("bought_at", ""))
+            asset_type = values.get("asset_type", "").lower() or infer_asset_type(symbol)
+            asset_name = values.get("asset_name") or None
+            currency = (values.get("currency") or "EUR").upper()
+        except ValueError as e:
+            errors.append((line_no, str(e)))
+        else:
+            rows.append((asset_type, symbol, asset_name, amount, buy_price, bought_at, currency, line_no))
+
+        lines_in_chunk += 1
+        if lines_in_chunk >= chunk_size:
+            yield rows, errors
+            rows, errors, lines_in_chunk = [], [], 0
+
+    if rows or errors:
+        yield rows, errors
@@ -1,32 +1,131 @@
+import hashlib
+import hmac
 import os
-import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import MutableMapping, Optional
+
 from databaseHandler import DatabaseAdministration
 
-AUTH_FILE = "auth.json"
+# key of the token in the per-session state (st.session_state)
+SESSION_KEY = "auth_token"
+
+# signing key; without SESSION_SECRET a random key per process (all sessions end on restart)
+SESSION_SECRET = os.getenv("SESSION_SECRET", "").encode("utf-8") or secrets.token_bytes(32)
+SESSION_TTL = float(os.getenv("SESSION_TTL", 12 * 60 * 60))   # Sekunden
+SESSION_CACHE_MAX_ENTRIES = 1024
+
+# per-user objects in the session (PortfolioManager, cached valuations, analysis),
+# dropped whenever the logged-in user changes or the login ends
+USER_SESSION_KEYS = ("manager", "valuation", "value_history", "prognose_analyse")
+
 
 class Authentication:
-    def __init__(self):
-        self.user_admin = DatabaseAdministration()
+    """
+    Login state per browser session.
+
+    ``login`` stores an HMAC-signed token (username, expiry, nonce) in the
+    session mapping passed in, normally ``st.session_state``. Verified tokens
+    are kept in an in-process LRU, so the check on every rerun is one
+    dictionary lookup; only unknown tokens are verified and read from the
+    database once.
+    """
 
-    def login(self, username, password):
+    def __init__(self, user_admin: DatabaseAdministration = None, secret: bytes = SESSION_SECRET, ttl: float = SESSION_TTL):
+        self.user_admin = user_admin or DatabaseAdministration()
+        self._secret = secret
+        self.ttl = ttl
+        self._verified: "OrderedDict[str, tuple]" = OrderedDict()   # token -> (user, expires_at)
+        self._revoked: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sign(self, payload: str) -> str:
+        return hmac.new(self._secret, payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def _issue_token(self, username: str) -> str:
+        payload = f"{username}|{int(time.time() + self.ttl)}|{secrets.token_hex(8)}"
+        return f"{payload}|{self._sign(payload)}"
+
+    def _remember(self, token: str, user: dict, expires_at: float) -> None:
+        with self._lock:
+            self._verified[token] = (user, expires_at)
+            self._verified.move_to_end(token)
+            while len(self._verified) > SESSION_CACHE_MAX_ENTRIES:
+                self._verified.popitem(last=False)
+
+    def login(self, username, password, session: MutableMapping):
 
         if self.user_admin.verify_login(username, password):
             user = self.user_admin.get_user_by_name(username)
-            # Save user data to a file
-            with open(AUTH_FILE, "w") as f:
-                json.dump(user, f)
+            token = self._issue_token(username)
+            self._remember(token, user, time.time() + self.ttl)
+            _clear_user_state(session)
+            session[SESSION_KEY] = token
             return user
 
         return None
 
-    def get_logged_in_user(self):
-        # Check if the auth file exists and return the user data
-        if os.path.exists(AUTH_FILE):
-            with open(AUTH_FILE, "r") as f:
-                return json.load(f)
-        return None
+    def get_logged_in_user(self, session: MutableMapping) -> Optional[dict]:
+        token = session.get(SESSION_KEY)
+        if not token:
+            return None
+
+        # hot path: token verified before
+        with self._lock:
+            cached = self._verified.get(token)
+            if cached is not None:
+                self._verified.move_to_end(token)
+        if cached is not None:
+            user, expires_at = cached
+            if time.time() < expires_at:
+                return user
+            self.logout(session)
+            return None
+
+        return self._verify(token, session)
+
+    def _verify(self, token: str, session: MutableMapping) -> Optional[dict]:
+        """Checks signature and expiry of a token that is not in the LRU (e.g. after eviction)."""
+        try:
+            username, expires, nonce, signature = token.rsplit("|", 3)
+            expires_at = float(expires)
+        except ValueError:
+            _end_session(session)
+            return None
+
+        with self._lock:
+            revoked = token in self._revoked
+        valid = hmac.compare_digest(signature, self._sign(f"{username}|{expires}|{nonce}"))
+        if revoked or not valid or time.time() >= expires_at:
+            _end_session(session)
+            return None
+
+        user = self.user_admin.get_user_by_name(username)
+        if user is None:
+            _end_session(session)
+            return None
+        self._remember(token, user, expires_at)
+        return user
+
+    def logout(self, session: MutableMapping):
+        # Remove the token and the per-user state from the session and invalidate the token
+        token = _end_session(session)
+        if token:
+            with self._lock:
+                self._verified.pop(token, None)
+                self._revoked[token] = None
+                while len(self._revoked) > SESSION_CACHE_MAX_ENTRIES:
+                    self._revoked.popitem(last=False)
+
+
+def _clear_user_state(session: MutableMapping) -> None:
+    for key in USER_SESSION_KEYS:
+        session.pop(key, None)
+
 
-    def logout(self):
-        # Remove the auth file to log out the user
-        if os.path.exists(AUTH_FILE):
-            os.remove(AUTH_FILE)
\ No newline at end of file
+def _end_session(session: MutableMapping) -> Optional[str]:
+    """Removes token and per-user state; returns the removed token."""
+    _clear_user_state(session)
+    return session.pop(SESSION_KEY, None)
@@ -0,0 +1,232 @@
+"""
+Backend benchmark suite: DatabaseAdministration, PortfolioManager,
+valuation and forecast timings on synthetic data at several scales.
+
+All market data comes from an offline fake provider (see synthetic_data.py),
+swapped in through the resource registry, so the numbers do not depend on
+the network. Results are written as JSON; ``--compare`` prints the ratio
+against an earlier run and can fail on regressions.
+
+Run from the repository root:
+    python -m benchmarks.backend_benchmark
+    python -m benchmarks.backend_benchmark --scales small medium --json results.json
+    python -m benchmarks.backend_benchmark --compare baseline.json --max-regression 1.3
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic_data import (
+    PASSWORD,
+    FakeMarketData,
+    FakeTickerMetadata,
+    generate_database,
+    synthetic_symbols,
+)
+from databaseHandler import DatabaseAdministration, connection_pool
+from resources import get_market_data_cache, registry
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# name -> (users, portfolios per user, assets per portfolio, distinct symbols)
+SCALES = {
+    "small": (10, 2, 20, 20),
+    "medium": (100, 3, 200, 100),
+    "large": (200, 3, 1000, 300),
+    "xlarge": (10, 1, 20000, 500),   # tens of thousands of lots in one portfolio
+}
+
+
+def _time(func: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "repeat": repeat,
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _install_fakes(tmp: Path, db: DatabaseAdministration) -> FakeMarketData:
+    from forecastcache import ForecastCache
+    from fxrates import FxRateStore
+    from llmclient import CachedLLMClient, LLMResponseCache, StubBackend
+
+    market_data = FakeMarketData()
+    registry.override("database", db)
+    registry.override("market_data", market_data)
+    registry.override("ticker_metadata", FakeTickerMetadata())
+    registry.override("fx_rates", FxRateStore(market_data))
+    registry.override("forecast_cache", ForecastCache(str(tmp / "forecasts.db")))
+    registry.override("llm_client", CachedLLMClient(StubBackend(), LLMResponseCache(str(tmp / "llmcache.db"))))
+    return market_data
+
+
+def run_scale(name: str, tmp: Path, repeat: int) -> List[Dict[str, object]]:
+    from portfoliohistory import value_history
+    from portfoliomanager import PortfolioManager
+    from valuation import value_portfolio
+
+    users, portfolios, assets, n_symbols = SCALES[name]
+    db_path = str(tmp / f"user-{name}.db")
+
+    start = time.perf_counter()
+    data = generate_database(db_path, users, portfolios, assets, synthetic_symbols(n_symbols))
+    print(f"\n== {name}: {users} users x {portfolios} portfolios x {assets} assets "
+          f"({users * portfolios * assets} lots, generated in {time.perf_counter() - start:.1f} s)")
+
+    db = DatabaseAdministration(db_path)
+    _install_fakes(tmp, db)
+    username = data["usernames"][len(data["usernames"]) // 2]
+    portfolio_id = data["portfolio_ids"][username][0]
+
+    cases: Dict[str, Dict[str, float]] = {}
+    cases["db.verify_login"] = _time(lambda: db.verify_login(username, PASSWORD), repeat)
+    cases["db.get_portfolios_with_revision"] = _time(lambda: db.get_portfolios_with_revision(username), repeat)
+    cases["db.get_assets_for_portfolio"] = _time(lambda: db.get_assets_for_portfolio(portfolio_id), repeat)
+    cases["db.iter_asset_rows"] = _time(lambda: list(db.iter_asset_rows(portfolio_id)), repeat)
+    cases["db.get_distinct_symbols"] = _time(db.get_distinct_symbols, repeat)
+
+    # cold: new manager per run, the portfolio is loaded from the database
+    managers = []
+    cases["manager.selectPortfolioId (cold)"] = _time(
+        lambda: managers[-1].selectPortfolioId(portfolio_id),
+        repeat,
+        setup=lambda: managers.append(PortfolioManager(username, db)),
+    )
+    # warm: served from the identity map after getPortfolios confirmed the revision
+    manager = PortfolioManager(username, db)
+    manager.getPortfolios()
+    manager.selectPortfolioId(portfolio_id)
+    cases["manager.selectPortfolioId (warm)"] = _time(lambda: manager.selectPortfolioId(portfolio_id), repeat)
+
+    portfolio = manager.currentPortfolio
+    cases["value_portfolio"] = _time(lambda: value_portfolio(portfolio), repeat)
+    one_year_ago = date.today() - timedelta(days=365)
+    cases["value_history (1y)"] = _time(lambda: value_history(portfolio, one_year_ago), max(1, repeat // 10))
+
+    results = []
+    for case, timing in cases.items():
+        print(f"   {case:<38}{timing['median_ms']:>12.3f} ms (median of {timing['repeat']})")
+        results.append({"scale": name, "case": case, **timing})
+    return results
+
+
+def run_forecast(tmp: Path, repeat: int) -> List[Dict[str, object]]:
+    """
+    prognose_kurs is independent of the portfolio size; new = ticker without
+    cached forecast, cached = same ticker again. The default auto mode
+    (NumPy backtest selection) always runs, ARIMA only with statsmodels.
+    """
+    from forecasters import auto_forecast
+    from prognose_analyse import BACKTEST_TAGE, PROGNOSE_TAGE, prognose_analyse
+
+    db = DatabaseAdministration(str(tmp / "user-forecast.db"))
+    _install_fakes(tmp, db)
+    tickers = iter(synthetic_symbols(2 * repeat, seed=1))
+    closes = get_market_data_cache().get_history("AAPL", date.today() - timedelta(days=BACKTEST_TAGE))["Close"].to_numpy()
+
+    auto = prognose_analyse(modell="auto")
+    auto.prognose_kurs("AAPL")   # later calls hit the forecast cache
+    cases = {
+        "auto_forecast (backtest + forecast)": _time(lambda: auto_forecast(closes, PROGNOSE_TAGE), repeat),
+        "prognose_kurs auto (new ticker)": _time(lambda: auto.prognose_kurs(next(tickers)), repeat),
+        "prognose_kurs auto (cached)": _time(lambda: auto.prognose_kurs("AAPL"), repeat),
+    }
+
+    if importlib.util.find_spec("statsmodels") is None:
+        print("\n== forecast: ARIMA cases skipped (statsmodels not installed)")
+    else:
+        arima = prognose_analyse(modell="arima")
+        arima.prognose_kurs("AAPL")   # fit once, later calls hit the forecast cache
+        cases["prognose_kurs arima (cold fit)"] = _time(lambda: arima.prognose_kurs(next(tickers)), repeat)
+        cases["prognose_kurs arima (cached)"] = _time(lambda: arima.prognose_kurs("AAPL"), repeat)
+
+    print("\n== forecast")
+    results = []
+    for case, timing in cases.items():
+        print(f"   {case:<38}{timing['median_ms']:>12.3f} ms (median of {timing['repeat']})")
+        results.append({"scale": "forecast", "case": case, **timing})
+    return results
+
+
+def compare(results: List[Dict[str, object]], baseline_path: str, max_regression: Optional[float]) -> bool:
+    baseline = {(r["scale"], r["case"]): r for r in json.loads(Path(baseline_path).read_text())["results"]}
+    ok = True
+    print(f"\n== compared with {baseline_path} (median, new / old)")
+    for r in results:
+        old = baseline.get((r["scale"], r["case"]))
+        if old is None or not old["median_ms"]:
+            continue
+        ratio = r["median_ms"] / old["median_ms"]
+        flag = ""
+        if max_regression is not None and ratio > max_regression:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"   {r['scale']:<9}{r['case']:<38}{ratio:>8.2f}x{flag}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=["small", "medium"], choices=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--forecast-repeat", type=int, default=3, help="0 skips the forecast cases")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    parser.add_argument("--max-regression", type=float, help="with --compare: exit 1 if a case got slower by this factor")
+    args = parser.parse_args()
+
+    results: List[Dict[str, object]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            for scale in args.scales:
+                results += run_scale(scale, Path(tmp), args.repeat)
+            if args.forecast_repeat:
+                results += run_forecast(Path(tmp), args.forecast_repeat)
+        finally:
+            registry.shutdown()
+            connection_pool.close_all()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"\nresults written to {args.json}")
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
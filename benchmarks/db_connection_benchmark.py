@@ -0,0 +1,71 @@
+"""
+Micro-benchmark: per-call latency of DatabaseAdministration methods with a
+new sqlite3 connection per call (old behaviour) vs. the pooled connection.
+
+Run from the repository root:
+    python -m benchmarks.db_connection_benchmark
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from databaseHandler import DatabaseAdministration
+
+
+class ConnectPerCallAdministration(DatabaseAdministration):
+    """Previous behaviour: open a connection and set the PRAGMA on every call."""
+
+    def _get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        return conn
+
+
+def _prepare(db_path: str, n_assets: int) -> int:
+    admin = DatabaseAdministration(db_path)
+    admin.add_user("bench", "bench@example.com", "geheim123")
+    portfolio_id = admin.get_portfolio_ids("bench")[0]
+    for i in range(n_assets):
+        admin.add_asset(portfolio_id, "stock", f"SYM{i % 50}", None, 1.0, 100.0, f"2024-01-{i % 28 + 1:02d}")
+    return portfolio_id
+
+
+def _time_per_call(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--assets", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        portfolio_id = _prepare(db_path, args.assets)
+
+        variants = {
+            "connect per call": ConnectPerCallAdministration(db_path),
+            "pooled": DatabaseAdministration(db_path),
+        }
+        calls = {
+            "verify_login": lambda a: a.verify_login("bench", "geheim123"),
+            "get_user_by_name": lambda a: a.get_user_by_name("bench"),
+            "get_portfolios_for_user": lambda a: a.get_portfolios_for_user("bench"),
+            "get_assets_for_portfolio": lambda a: a.get_assets_for_portfolio(portfolio_id),
+        }
+
+        print(f"{'method':<26}" + "".join(f"{name:>20}" for name in variants) + f"{'speedup':>10}")
+        for method, call in calls.items():
+            results = [_time_per_call(lambda: call(admin), args.repeat) for admin in variants.values()]
+            row = "".join(f"{us:>17.1f} µs" for us in results)
+            print(f"{method:<26}{row}{results[0] / results[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Cold-start benchmark: import time per module, measured with ``python -X importtime``
+in a fresh interpreter for every target.
+
+Run from the repository root:
+    python -m benchmarks.startup_importtime
+    python -m benchmarks.startup_importtime app pages.portfolio_page --json startup.json
+    python -m benchmarks.startup_importtime --fail-on-heavy    # exit 1 if app pulls in the analytics stack
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_TARGETS = ["app", "pages.dashboard", "pages.portfolio_page", "prognose_analyse"]
+
+# should only be imported when a forecast or sentiment run starts
+HEAVY_PACKAGES = ("statsmodels", "matplotlib", "gnews", "google.genai")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def _repo_modules() -> set:
+    modules = {p.stem for p in REPO_ROOT.glob("*.py")}
+    modules |= {f"pages.{p.stem}" for p in (REPO_ROOT / "pages").glob("*.py")}
+    return modules
+
+
+def measure(target: str) -> dict:
+    """Imports ``target`` in a new interpreter and parses the -X importtime report."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "module": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": len(indent) // 2,
+            })
+
+    repo_modules = _repo_modules()
+    per_package = defaultdict(int)
+    for entry in entries:
+        per_package[entry["module"].split(".")[0]] += entry["self_us"]
+
+    loaded = {entry["module"] for entry in entries}
+    return {
+        "target": target,
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(sum(e["self_us"] for e in entries) / 1000, 1),
+        "repo_modules_ms": {
+            e["module"]: round(e["cumulative_us"] / 1000, 1) for e in entries if e["module"] in repo_modules
+        },
+        "top_packages_ms": {
+            name: round(us / 1000, 1) for name, us in sorted(per_package.items(), key=lambda kv: -kv[1])[:15]
+        },
+        "heavy_loaded": [p for p in HEAVY_PACKAGES if p in loaded],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--fail-on-heavy", action="store_true", help="exit 1 if 'app' imports a heavy package")
+    args = parser.parse_args()
+
+    results = [measure(target) for target in args.targets]
+
+    for result in results:
+        print(f"\n== {result['target']}: {result['import_ms']:.1f} ms import, {result['wall_ms']:.1f} ms wall")
+        if not result["ok"]:
+            print(f"   import failed: {result['error']}")
+            continue
+        print("   repo modules (cumulative):")
+        for name, ms in sorted(result["repo_modules_ms"].items(), key=lambda kv: -kv[1]):
+            print(f"     {name:<28}{ms:>10.1f} ms")
+        print("   heaviest packages (self):")
+        for name, ms in result["top_packages_ms"].items():
+            print(f"     {name:<28}{ms:>10.1f} ms")
+        if result["heavy_loaded"]:
+            print(f"   heavy analytics packages loaded: {', '.join(result['heavy_loaded'])}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+    if args.fail_on_heavy:
+        app = next((r for r in results if r["target"] == "app"), None) or measure("app")
+        if app["heavy_loaded"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
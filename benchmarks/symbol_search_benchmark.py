@@ -0,0 +1,58 @@
+"""
+Micro-benchmark: autocomplete latency of the local symbol search index
+(prefix, name and fuzzy queries) over a synthetic symbol list.
+
+Run from the repository root:
+    python -m benchmarks.symbol_search_benchmark
+"""
+import argparse
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from symbolsearch import SymbolSearchIndex
+
+QUERIES = ["a", "ap", "apple", "aple", "microsfot", "btc usd", "sap.d", "corp"]
+
+
+def _random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))).title()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SymbolSearchIndex(str(Path(tmp) / "bench.db"), symbol_list_path=None)
+
+        symbols = [
+            ("AAPL", "Apple Inc."),
+            ("MSFT", "Microsoft Corporation"),
+            ("BTC-USD", "Bitcoin USD"),
+            ("SAP.DE", "SAP SE"),
+        ]
+        for _ in range(args.symbols):
+            symbol = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 5)))
+            symbols.append((symbol, f"{_random_word(rng)} {_random_word(rng)}"))
+
+        start = time.perf_counter()
+        index.add_many(symbols)
+        print(f"index build: {len(index)} symbols in {time.perf_counter() - start:.2f} s")
+
+        print(f"{'query':<12}{'latency':>14}  top hits")
+        for query in QUERIES:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                hits = index.search_local(query)
+            us = (time.perf_counter() - start) / args.repeat * 1e6
+            print(f"{query:<12}{us:>11.1f} µs  {', '.join(h['symbol'] for h in hits[:3])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Synthetic test data for the benchmarks: a user.db with configurable numbers
+of users, portfolios and lots, and an offline market data provider with
+deterministic random-walk prices.
+"""
+import hashlib
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from databaseHandler import DatabaseAdministration
+from marketdatacache import PERIOD_DAYS, TRADING_DAY_PERIODS
+from marketdataprovider import OHLCV_COLUMNS
+
+PASSWORD = "geheim123"
+
+# symbol -> trading currency of the fake market
+CURRENCIES = {"USD": 0.6, "EUR": 0.3, "CHF": 0.1}
+
+FIRST_DAY = date(2015, 1, 1)
+
+
+def synthetic_symbols(n: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    symbols = set()
+    while len(symbols) < n:
+        symbols.add("".join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=rng.randint(3, 5))))
+    return sorted(symbols)
+
+
+def generate_database(
+    db_path: str,
+    users: int,
+    portfolios_per_user: int,
+    assets_per_portfolio: int,
+    symbols: Sequence[str],
+    seed: int = 0,
+) -> Dict[str, object]:
+    """
+    Fills ``db_path`` and returns {"usernames": [...], "portfolio_ids": {username: [...]}}.
+    Every user gets ``portfolios_per_user`` portfolios (the one created by add_user included),
+    every portfolio ``assets_per_portfolio`` lots over random symbols and dates.
+    """
+    rng = random.Random(seed)
+    admin = DatabaseAdministration(db_path)
+    today = date.today()
+    span = (today - FIRST_DAY).days
+
+    usernames = []
+    portfolio_ids = {}
+    for u in range(users):
+        username = f"user{u:05d}"
+        admin.add_user(username, f"{username}@example.com", PASSWORD)
+        ids = admin.get_portfolio_ids(username)
+        for p in range(len(ids), portfolios_per_user):
+            ids.append(admin.create_portfolio(username, f"Portfolio {p}"))
+
+        for portfolio_id in ids:
+            lots = []
+            for _ in range(assets_per_portfolio):
+                symbol = rng.choice(symbols)
+                lots.append((
+                    "stock",
+                    symbol,
+                    f"{symbol} AG",
+                    round(rng.uniform(0.5, 100.0), 4),
+                    round(rng.uniform(5.0, 500.0), 2),
+                    (FIRST_DAY + timedelta(days=rng.randrange(span))).isoformat(),
+                ))
+            admin.add_assets_bulk(portfolio_id, lots)
+
+        usernames.append(username)
+        portfolio_ids[username] = ids
+
+    return {"usernames": usernames, "portfolio_ids": portfolio_ids}
+
+
+def _seed_for(symbol: str) -> int:
+    return int.from_bytes(hashlib.sha256(symbol.encode("utf-8")).digest()[:4], "little")
+
+
+class FakeMarketData:
+    """
+    Drop-in for MarketDataCache without network access: every symbol is a
+    deterministic random walk of business-day closes from FIRST_DAY on.
+    FX pairs ({CCY}EUR=X) move around a plausible level.
+    """
+
+    def __init__(self) -> None:
+        self._series: Dict[str, pd.DataFrame] = {}
+        self.calls = 0
+
+    def _full(self, symbol: str) -> pd.DataFrame:
+        data = self._series.get(symbol)
+        if data is None:
+            rng = np.random.default_rng(_seed_for(symbol))
+            index = pd.bdate_range(FIRST_DAY, date.today(), name="Date")
+            level = {"USDEUR=X": 0.9, "CHFEUR=X": 1.02}.get(symbol, rng.uniform(10, 400))
+            close = level * np.exp(np.cumsum(rng.normal(0, 0.01 if symbol.endswith("=X") else 0.02, len(index))))
+            data = pd.DataFrame({
+                "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                "Volume": rng.integers(1_000, 1_000_000, len(index)).astype(float),
+            }, index=index)[OHLCV_COLUMNS]
+            self._series[symbol] = data
+        return data
+
+    def get_history(self, symbol: str, start, end=None, interval: str = "1d") -> pd.DataFrame:
+        self.calls += 1
+        data = self._full(symbol)
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start)]
+        if end is not None:
+            data = data[data.index < pd.Timestamp(end)]
+        return data
+
+    def get_period(self, symbol: str, period: str, interval: str = "1d") -> pd.DataFrame:
+        if period in TRADING_DAY_PERIODS:
+            return self._full(symbol).iloc[-TRADING_DAY_PERIODS[period]:]
+        days = PERIOD_DAYS.get(period) or (date.today() - FIRST_DAY).days
+        return self.get_history(symbol, date.today() - timedelta(days=days))
+
+    def get_quotes(self, symbols: Sequence[str]) -> Dict[str, float]:
+        self.calls += 1
+        return {s: float(self._full(s)["Close"].iloc[-1]) for s in dict.fromkeys(symbols)}
+
+
+class FakeTickerMetadata:
+    """Drop-in for TickerMetadataStore: currency drawn per symbol, names from the symbol."""
+
+    def currency(self, symbol: str) -> Optional[str]:
+        rng = random.Random(_seed_for(symbol))
+        return rng.choices(list(CURRENCIES), weights=list(CURRENCIES.values()))[0]
+
+    def name(self, symbol: str) -> Optional[str]:
+        return f"{symbol} AG"
+
+    long_name = name
+
+    def quote_type(self, symbol: str) -> Optional[str]:
+        return "EQUITY"
+
+    def timezone(self, symbol: str) -> Optional[str]:
+        return "Europe/Berlin"
+
+    def close(self) -> None:
+        pass
+
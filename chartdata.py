@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+import numpy as np
+import pandas as pd
+
+# maximal number of points sent to the browser per line
+MAX_CHART_POINTS = 1500
+# from this many points on the line is drawn with WebGL (go.Scattergl)
+WEBGL_MIN_POINTS = 1000
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of ``n_out`` points that keep the
+    visual shape of the series (peaks and dips survive). First and last point
+    are always kept; x must be increasing.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets between the fixed first and last point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo = edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        # area of the triangle (selected point of the last bucket, candidate, average of the next bucket)
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+def downsample(series: pd.Series, max_points: int = MAX_CHART_POINTS) -> pd.Series:
+    """LTTB on a time-indexed series; NaN values are dropped first."""
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    x = series.index.asi8.astype(float) if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series), dtype=float)
+    return series.iloc[lttb_indices(x, series.to_numpy(dtype=float), max_points)]
+
+
+def scatter_class(n_points: int):
+    """go.Scattergl for long series, go.Scatter otherwise."""
+    import plotly.graph_objects as go
+    return go.Scattergl if n_points >= WEBGL_MIN_POINTS else go.Scatter
+
+
+class ChartSeriesCache:
+    """
+    Downsampled chart series per (symbol, period, interval).
+
+    An entry is reused as long as the underlying data is unchanged (same
+    length, last timestamp and last value), so reruns do not downsample again.
+    """
+
+    def __init__(self, max_entries: int = 128, max_points: int = MAX_CHART_POINTS) -> None:
+        self.max_entries = max_entries
+        self.max_points = max_points
+        self._entries: "OrderedDict[Hashable, Tuple[tuple, pd.Series]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(series: pd.Series) -> tuple:
+        if series.empty:
+            return (0,)
+        return (len(series), series.index[-1], float(series.iloc[-1]))
+
+    def get(self, symbol: str, period: str, interval: str, series: pd.Series) -> pd.Series:
+        key = (symbol, period, interval)
+        fingerprint = self._fingerprint(series)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self._entries.move_to_end(key)
+                return cached[1]
+
+        reduced = downsample(series, self.max_points)
+        with self._lock:
+            self._entries[key] = (fingerprint, reduced)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return reduced
@@ -1,7 +1,246 @@
 import sqlite3
+import threading
+import weakref
 from pathlib import Path
 import hashlib
-from typing import Optional, List, Dict, Any
+import json
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+
+class ConnectionPool:
+    """
+    Keeps one sqlite3 connection per (thread, database file) and reuses it.
+
+    Connections are opened lazily, tuned once with PRAGMAs and keep their
+    statement cache, so repeated queries skip connect + prepare. Connections
+    of finished threads are closed the next time a new one is opened.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL;",
+        "PRAGMA synchronous = NORMAL;",     # safe with WAL, no fsync per commit
+        "PRAGMA cache_size = -16000;",      # 16 MB page cache
+        "PRAGMA mmap_size = 268435456;",    # 256 MB memory mapped I/O
+        "PRAGMA temp_store = MEMORY;",
+        "PRAGMA foreign_keys = ON;",        # important for ON DELETE/UPDATE CASCADE
+    )
+
+    def __init__(self, cached_statements: int = 256) -> None:
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open: List[tuple] = []   # (weakref to owning thread, connection)
+        self._generation = 0
+
+    def get(self, db_path: str) -> sqlite3.Connection:
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            local.connections = {}
+            local.generation = self._generation
+
+        conn = local.connections.get(db_path)
+        if conn is None:
+            conn = self._connect(db_path)
+            local.connections[db_path] = conn
+            with self._lock:
+                self._close_orphans()
+                self._open.append((weakref.ref(threading.current_thread()), conn))
+        return conn
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        # check_same_thread=False only so close_all() may close it; every
+        # connection is still used by its owning thread alone
+        conn = sqlite3.connect(
+            db_path,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _close_orphans(self) -> None:
+        alive = []
+        for thread_ref, conn in self._open:
+            thread = thread_ref()
+            if thread is None or not thread.is_alive():
+                conn.close()
+            else:
+                alive.append((thread_ref, conn))
+        self._open = alive
+
+    def close_all(self) -> None:
+        with self._lock:
+            for _, conn in self._open:
+                conn.close()
+            self._open = []
+            self._generation += 1
+
+
+# shared by every DatabaseAdministration (and other sqlite stores) in the process
+connection_pool = ConnectionPool()
+
+
+# --------- Schema migrations ---------
+
+_migrated_paths = set()
+_migration_lock = threading.Lock()
+
+
+def run_migrations(db_path: str, migrations: List[tuple]) -> None:
+    """
+    Brings the database file up to the newest schema version.
+
+    ``migrations`` is a list of (version, [sql, ...]) in ascending order.
+    The applied version is stored in PRAGMA user_version, so every step runs
+    exactly once per file. Within a process the check itself only runs once
+    per file as well.
+    """
+    key = str(Path(db_path).resolve())
+    with _migration_lock:
+        if key in _migrated_paths:
+            return
+
+        Path(db_path).touch(exist_ok=True)
+        conn = connection_pool.get(db_path)
+        current = conn.execute("PRAGMA user_version;").fetchone()[0]
+
+        for version, statements in migrations:
+            if version <= current:
+                continue
+            # IMMEDIATE: another process migrating the same file has to wait
+            conn.execute("BEGIN IMMEDIATE;")
+            try:
+                if conn.execute("PRAGMA user_version;").fetchone()[0] < version:
+                    for statement in statements:
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {int(version)};")
+                conn.execute("COMMIT;")
+            except Exception:
+                conn.execute("ROLLBACK;")
+                raise
+            current = version
+
+        _migrated_paths.add(key)
+
+
+MIGRATIONS = [
+    # 1: initial schema (IF NOT EXISTS, so databases created before versioning pass)
+    (1, [
+        # users table
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            passwort_hash TEXT NOT NULL,
+            erstellt_am TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        # portfolio table (one user → many portfolios)
+        """
+        CREATE TABLE IF NOT EXISTS portfolio (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            portfolio_username TEXT NOT NULL,
+            portfolio_name TEXT NOT NULL,
+            erstellt_am TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (portfolio_username)
+                REFERENCES users(username)
+                ON DELETE CASCADE
+                ON UPDATE CASCADE
+        );
+        """,
+        # assets table (one portfolio → many assets)
+        """
+        CREATE TABLE IF NOT EXISTS assets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            portfolio_id INTEGER NOT NULL,
+            asset_type TEXT NOT NULL,      -- 'crypto' or 'stock'
+            asset_symbol TEXT NOT NULL,    -- e.g. 'BTC', 'AAPL'
+            asset_name TEXT,
+            amount REAL NOT NULL,
+            buy_price REAL NOT NULL,       -- per unit
+            bought_at TIMESTAMP NOT NULL,  -- when it was bought
+            currency TEXT NOT NULL DEFAULT 'EUR',
+            FOREIGN KEY (portfolio_id)
+                REFERENCES portfolio(id)
+                ON DELETE CASCADE
+                ON UPDATE CASCADE
+        );
+        """,
+    ]),
+    # 2: covering indexes for the per-user / per-portfolio lookups
+    (2, [
+        # get_portfolios_for_user / get_portfolio_ids (id is the rowid, ORDER BY id via index)
+        """
+        CREATE INDEX IF NOT EXISTS idx_portfolio_username
+        ON portfolio (portfolio_username, id, portfolio_name);
+        """,
+        # get_assets_for_portfolio: WHERE portfolio_id = ? ORDER BY bought_at, no table lookup
+        """
+        CREATE INDEX IF NOT EXISTS idx_assets_portfolio_bought
+        ON assets (portfolio_id, bought_at, asset_type, asset_symbol, asset_name, amount, buy_price);
+        """,
+    ]),
+    # 3: change counter per portfolio, bumped by every write to its assets (inserts: see 5)
+    (3, [
+        "ALTER TABLE portfolio ADD COLUMN revision INTEGER NOT NULL DEFAULT 0;",
+        # keep get_portfolios_with_revision index-only
+        "DROP INDEX IF EXISTS idx_portfolio_username;",
+        """
+        CREATE INDEX idx_portfolio_username
+        ON portfolio (portfolio_username, id, portfolio_name, revision);
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_assets_insert_revision AFTER INSERT ON assets
+        BEGIN
+            UPDATE portfolio SET revision = revision + 1 WHERE id = NEW.portfolio_id;
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_assets_update_revision AFTER UPDATE ON assets
+        BEGIN
+            UPDATE portfolio SET revision = revision + 1 WHERE id IN (OLD.portfolio_id, NEW.portfolio_id);
+        END;
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_assets_delete_revision AFTER DELETE ON assets
+        BEGIN
+            UPDATE portfolio SET revision = revision + 1 WHERE id = OLD.portfolio_id;
+        END;
+        """,
+    ]),
+    # 4: results of the background precompute scheduler, one row per symbol
+    (4, [
+        """
+        CREATE TABLE IF NOT EXISTS precomputed_forecasts (
+            symbol TEXT PRIMARY KEY,
+            computed_at TIMESTAMP NOT NULL,
+            model TEXT,
+            mape REAL,
+            hist_dates TEXT NOT NULL,      -- JSON list of ISO dates
+            hist_values TEXT NOT NULL,     -- JSON list of closing prices
+            pred_days TEXT NOT NULL,       -- JSON list of ISO dates
+            predictions TEXT NOT NULL      -- JSON list of forecast values
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS precomputed_sentiment (
+            symbol TEXT PRIMARY KEY,
+            computed_at TIMESTAMP NOT NULL,
+            empfehlung TEXT NOT NULL,
+            stichwoerter TEXT,
+            konfidenz REAL
+        );
+        """,
+    ]),
+    # 5: the insert trigger fired once per row, i.e. one extra UPDATE per imported asset;
+    # add_asset / add_assets_bulk bump the revision themselves, once per statement
+    (5, [
+        "DROP TRIGGER IF EXISTS trg_assets_insert_revision;",
+    ]),
+]
 
 
 class DatabaseAdministration:
@@ -9,68 +248,13 @@ class DatabaseAdministration:
         self.db_path = db_path
         self._ensure_db()
 
-    def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        # important for ON DELETE/UPDATE CASCADE
-        conn.execute("PRAGMA foreign_keys = ON;")
-        return conn
+    def _get_connection(self) -> sqlite3.Connection:
+        # pooled per thread; use as "with self._get_connection() as conn:",
+        # which commits or rolls back but keeps the connection open
+        return connection_pool.get(self.db_path)
 
     def _ensure_db(self) -> None:
-        Path(self.db_path).touch(exist_ok=True)
-        with self._get_connection() as conn:
-            cur = conn.cursor()
-
-            # users table
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    passwort_hash TEXT NOT NULL,
-                    erstellt_am TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                """
-            )
-
-            # portfolio table (one user → many portfolios)
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS portfolio (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    portfolio_username TEXT NOT NULL,
-                    portfolio_name TEXT NOT NULL,
-                    erstellt_am TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (portfolio_username)
-                        REFERENCES users(username)
-                        ON DELETE CASCADE
-                        ON UPDATE CASCADE
-                );
-                """
-            )
-
-            # assets table (one portfolio → many assets)
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS assets (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    portfolio_id INTEGER NOT NULL,
-                    asset_type TEXT NOT NULL,      -- 'crypto' or 'stock'
-                    asset_symbol TEXT NOT NULL,    -- e.g. 'BTC', 'AAPL'
-                    asset_name TEXT,
-                    amount REAL NOT NULL,
-                    buy_price REAL NOT NULL,       -- per unit
-                    bought_at TIMESTAMP NOT NULL,  -- when it was bought
-                    currency TEXT NOT NULL DEFAULT 'EUR',
-                    FOREIGN KEY (portfolio_id)
-                        REFERENCES portfolio(id)
-                        ON DELETE CASCADE
-                        ON UPDATE CASCADE
-                );
-                """
-            )
-
-            conn.commit()
+        run_migrations(self.db_path, MIGRATIONS)
 
     @staticmethod
     def _hash_passwort(passwort: str) -> str:
@@ -229,6 +413,31 @@ class DatabaseAdministration:
                 
             return portfolio_list
         
+    def get_portfolios_with_revision(self, username: str) -> List[Tuple[int, str, int]]:
+        """
+        Like get_portfolios_for_user, plus the change counter of every portfolio
+        (bumped by each insert/update/delete of its assets).
+        """
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT id, portfolio_name, revision
+                FROM portfolio
+                WHERE portfolio_username = ?
+                ORDER BY id
+                """,
+                (username,)
+            )
+            return cur.fetchall()
+
+    def get_portfolio_revision(self, portfolio_id: int) -> Optional[int]:
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT revision FROM portfolio WHERE id = ?", (portfolio_id,))
+            row = cur.fetchone()
+            return row[0] if row else None
+
     def get_portfolio_ids(self, username: str):
         with self._get_connection() as conn:
             cur = conn.cursor()
@@ -278,12 +487,51 @@ class DatabaseAdministration:
                     ),
                 )
                 asset_id = cur.lastrowid
+                self._bump_revision(cur, portfolio_id)
                 conn.commit()
                 return asset_id
         except sqlite3.IntegrityError:
             return None
         
 
+    @staticmethod
+    def _bump_revision(cur: sqlite3.Cursor, portfolio_id: int) -> None:
+        cur.execute("UPDATE portfolio SET revision = revision + 1 WHERE id = ?", (portfolio_id,))
+
+    def add_assets_bulk(
+        self,
+        portfolio_id: int,
+        assets: Iterable[Tuple[str, str, Optional[str], float, float, str]],
+    ) -> Optional[int]:
+        """
+        Inserts many assets in one transaction with executemany.
+        ``assets`` yields (asset_type, asset_symbol, asset_name, amount, buy_price, bought_at),
+        prices already in EUR. Returns the number of inserted rows or None on error
+        (nothing is inserted in that case).
+        """
+        rows = (
+            (portfolio_id, asset_type, asset_symbol, asset_name, amount, buy_price, bought_at, "EUR")
+            for asset_type, asset_symbol, asset_name, amount, buy_price, bought_at in assets
+        )
+        try:
+            with self._get_connection() as conn:
+                cur = conn.cursor()
+                cur.executemany(
+                    """
+                    INSERT INTO assets
+                    (portfolio_id, asset_type, asset_symbol, asset_name, amount, buy_price, bought_at, currency)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+                inserted = cur.rowcount
+                if inserted:
+                    # one revision bump for the whole batch, same transaction
+                    self._bump_revision(cur, portfolio_id)
+                return inserted
+        except sqlite3.IntegrityError:
+            return None
+
     def get_assets_for_portfolio(self, portfolio_id: int) -> List[Dict[str, Any]]:
         with self._get_connection() as conn:
             cur = conn.cursor()
@@ -317,6 +565,23 @@ class DatabaseAdministration:
             return all_assets
 
 
+    def iter_asset_rows(self, portfolio_id: int) -> sqlite3.Cursor:
+        """
+        Cursor over (id, asset_type, asset_symbol, asset_name, amount, buy_price, bought_at)
+        of the portfolio, ordered by bought_at. Lets the caller build its columns
+        straight from the rows without intermediate dicts.
+        """
+        conn = self._get_connection()
+        return conn.execute(
+            """
+            SELECT id, asset_type, asset_symbol, asset_name, amount, buy_price, bought_at
+            FROM assets
+            WHERE portfolio_id = ?
+            ORDER BY bought_at
+            """,
+            (portfolio_id,),
+        )
+
     def delete_asset(self, asset_id: int) -> bool:
         with self._get_connection() as conn:
             cur = conn.cursor()
@@ -324,3 +589,117 @@ class DatabaseAdministration:
             conn.commit()
             return cur.rowcount > 0
 
+
+    def get_distinct_symbols(self) -> List[Tuple[str, Optional[str]]]:
+        """All symbols held in any portfolio as [(asset_symbol, asset_name), ...]."""
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT asset_symbol, MAX(asset_name)
+                FROM assets
+                GROUP BY asset_symbol
+                ORDER BY asset_symbol
+                """
+            )
+            return cur.fetchall()
+
+
+    # --------- Precomputed analyses ---------
+
+    def save_precomputed_forecast(self, symbol: str, forecast: Dict[str, Any]) -> None:
+        """forecast: dict with hist_dates, hist_values, pred_days, predictions, modell, mape."""
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO precomputed_forecasts
+                (symbol, computed_at, model, mape, hist_dates, hist_values, pred_days, predictions)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    symbol,
+                    datetime.now().isoformat(timespec="seconds"),
+                    forecast.get("modell"),
+                    forecast.get("mape"),
+                    json.dumps(forecast["hist_dates"]),
+                    json.dumps(forecast["hist_values"]),
+                    json.dumps(forecast["pred_days"]),
+                    json.dumps(forecast["predictions"]),
+                ),
+            )
+
+    def get_precomputed_forecast(self, symbol: str) -> Optional[Dict[str, Any]]:
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT computed_at, model, mape, hist_dates, hist_values, pred_days, predictions
+                FROM precomputed_forecasts
+                WHERE symbol = ?
+                """,
+                (symbol,),
+            )
+            row = cur.fetchone()
+        if row is None:
+            return None
+        return {
+            "computed_at": datetime.fromisoformat(row[0]),
+            "modell": row[1],
+            "mape": row[2],
+            "hist_dates": json.loads(row[3]),
+            "hist_values": json.loads(row[4]),
+            "pred_days": json.loads(row[5]),
+            "predictions": json.loads(row[6]),
+        }
+
+    def save_precomputed_sentiment(self, symbol: str, sentiment: Dict[str, Any]) -> None:
+        """sentiment: dict with empfehlung, stichwoerter, konfidenz."""
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO precomputed_sentiment
+                (symbol, computed_at, empfehlung, stichwoerter, konfidenz)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    symbol,
+                    datetime.now().isoformat(timespec="seconds"),
+                    sentiment["empfehlung"],
+                    sentiment.get("stichwoerter"),
+                    sentiment.get("konfidenz"),
+                ),
+            )
+
+    def get_precomputed_sentiment(self, symbol: str) -> Optional[Dict[str, Any]]:
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT computed_at, empfehlung, stichwoerter, konfidenz
+                FROM precomputed_sentiment
+                WHERE symbol = ?
+                """,
+                (symbol,),
+            )
+            row = cur.fetchone()
+        if row is None:
+            return None
+        return {
+            "computed_at": datetime.fromisoformat(row[0]),
+            "empfehlung": row[1],
+            "stichwoerter": row[2],
+            "konfidenz": row[3],
+        }
+
+    def get_precomputed_times(self) -> Dict[str, datetime]:
+        """{symbol: time of the older of both results} for symbols with forecast and sentiment."""
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT f.symbol, MIN(f.computed_at, s.computed_at)
+                FROM precomputed_forecasts f
+                JOIN precomputed_sentiment s ON s.symbol = f.symbol
+                """
+            )
+            return {symbol: datetime.fromisoformat(ts) for symbol, ts in cur.fetchall()}
@@ -0,0 +1,125 @@
+import json
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from databaseHandler import connection_pool, run_migrations
+
+MIGRATIONS = [
+    (1, [
+        # latest fit per (ticker, model order); last_ts = timestamp of the last bar used for the fit
+        """
+        CREATE TABLE IF NOT EXISTS model_fits (
+            ticker TEXT NOT NULL,
+            model_order TEXT NOT NULL,     -- e.g. '6,1,3'
+            last_ts TEXT NOT NULL,
+            params TEXT NOT NULL,          -- JSON list of fitted parameters
+            forecast TEXT NOT NULL,        -- JSON list of forecast values
+            created_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (ticker, model_order)
+        );
+        """,
+    ]),
+    (2, [
+        # automatically selected model and its backtest error
+        "ALTER TABLE model_fits ADD COLUMN model TEXT;",
+        "ALTER TABLE model_fits ADD COLUMN mape REAL;",
+    ]),
+    (3, [
+        # close of the last bar: during trading hours the last bar is still forming, same
+        # timestamp with a new close must not hit the cache (older rows have NULL -> one refit)
+        "ALTER TABLE model_fits ADD COLUMN last_close REAL;",
+    ]),
+]
+
+
+def _order_key(order: Union[str, Sequence[int]]) -> str:
+    # an ARIMA order like (6, 1, 3) or a method name like 'auto'
+    if isinstance(order, str):
+        return order
+    return ",".join(str(int(o)) for o in order)
+
+
+class ForecastCache:
+    """
+    Persists fitted model parameters and forecasts.
+
+    ``get`` answers only if the fit was made on data ending at the same
+    last bar with the same close, so an intraday snapshot of today's bar is
+    not reused once the price moved. ``latest_params`` returns the parameters of the previous fit
+    regardless, so a new fit can be warm-started from them.
+    """
+
+    def __init__(self, db_path: str = "forecasts.db") -> None:
+        self.db_path = db_path
+        run_migrations(self.db_path, MIGRATIONS)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        return connection_pool.get(self.db_path)
+
+    def _get_row(self, ticker: str, order: Sequence[int]) -> Optional[Tuple[str, str, str, Optional[str], Optional[float], Optional[float]]]:
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT last_ts, params, forecast, model, mape, last_close
+                FROM model_fits
+                WHERE ticker = ? AND model_order = ?
+                """,
+                (ticker, _order_key(order)),
+            )
+            return cur.fetchone()
+
+    @staticmethod
+    def _matches(row, last_ts: str, last_close: float) -> bool:
+        return row is not None and row[0] == last_ts and row[5] == float(last_close)
+
+    def get(self, ticker: str, order: Sequence[int], last_ts: str, last_close: float) -> Optional[List[float]]:
+        row = self._get_row(ticker, order)
+        if not self._matches(row, last_ts, last_close):
+            return None
+        return json.loads(row[2])
+
+    def get_entry(self, ticker: str, order: Sequence[int], last_ts: str, last_close: float) -> Optional[Dict[str, Any]]:
+        """Like ``get``, plus the selected model and its backtest MAPE."""
+        row = self._get_row(ticker, order)
+        if not self._matches(row, last_ts, last_close):
+            return None
+        return {"forecast": json.loads(row[2]), "model": row[3], "mape": row[4]}
+
+    def latest_params(self, ticker: str, order: Sequence[int]) -> Optional[List[float]]:
+        row = self._get_row(ticker, order)
+        if row is None:
+            return None
+        return json.loads(row[1])
+
+    def put(
+        self,
+        ticker: str,
+        order: Sequence[int],
+        last_ts: str,
+        last_close: float,
+        params: Sequence[float],
+        forecast: Sequence[float],
+        model: Optional[str] = None,
+        mape: Optional[float] = None,
+    ) -> None:
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO model_fits
+                (ticker, model_order, last_ts, last_close, params, forecast, created_at, model, mape)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    ticker,
+                    _order_key(order),
+                    last_ts,
+                    float(last_close),
+                    json.dumps([float(p) for p in params]),
+                    json.dumps([float(f) for f in forecast]),
+                    datetime.now().isoformat(),
+                    model,
+                    mape,
+                ),
+            )
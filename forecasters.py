@@ -0,0 +1,124 @@
+"""
+Lightweight price forecasters in NumPy and a rolling-origin backtest.
+
+All models work on log prices and take a 2-D array of windows (one row per
+forecast origin), so the backtest evaluates every origin of a ticker's
+history in one vectorized call per model.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# length of the history each forecast is based on (trading days)
+WINDOW = 60
+# at most this many origins are backtested (the most recent ones)
+MAX_ORIGINS = 250
+
+SES_ALPHAS = np.array([0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+AR_ORDER = 5
+AR_RIDGE = 1e-6
+
+
+def naive_forecast(windows: np.ndarray, horizon: int) -> np.ndarray:
+    """Random walk: the last value stays."""
+    return np.repeat(windows[:, -1:], horizon, axis=1)
+
+
+def drift_forecast(windows: np.ndarray, horizon: int) -> np.ndarray:
+    """Straight line through the first and last value of the window, extended."""
+    slope = (windows[:, -1] - windows[:, 0]) / (windows.shape[1] - 1)
+    return windows[:, -1:] + slope[:, None] * np.arange(1, horizon + 1)
+
+
+def ses_forecast(windows: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Simple exponential smoothing. All alphas of SES_ALPHAS run side by side;
+    per window the one with the smallest in-sample one-step error is used.
+    """
+    rows = len(windows)
+    level = np.repeat(windows[:, :1], len(SES_ALPHAS), axis=1)
+    sse = np.zeros_like(level)
+    for j in range(1, windows.shape[1]):
+        error = windows[:, j:j + 1] - level
+        sse += error ** 2
+        level = level + SES_ALPHAS * error
+    final = level[np.arange(rows), np.argmin(sse, axis=1)]
+    return np.repeat(final[:, None], horizon, axis=1)
+
+
+def ar_forecast(windows: np.ndarray, horizon: int, order: int = AR_ORDER) -> np.ndarray:
+    """
+    AR(order) on the daily log returns, fitted per window by least squares
+    (batched normal equations) and iterated over the horizon.
+    """
+    returns = np.diff(windows, axis=1)
+    mean = returns.mean(axis=1, keepdims=True)
+    centered = returns - mean
+
+    lagged = sliding_window_view(centered, order + 1, axis=1)   # [rows, samples, order + 1]
+    X, y = lagged[:, :, :-1], lagged[:, :, -1]
+    XtX = np.einsum("rki,rkj->rij", X, X) + AR_RIDGE * np.eye(order)
+    Xty = np.einsum("rki,rk->ri", X, y)
+    coef = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+
+    recent = centered[:, -order:]
+    steps = np.empty((len(windows), horizon))
+    for k in range(horizon):
+        step = np.einsum("ri,ri->r", recent, coef)
+        steps[:, k] = step
+        recent = np.concatenate([recent[:, 1:], step[:, None]], axis=1)
+
+    return windows[:, -1:] + np.cumsum(steps + mean, axis=1)
+
+
+FORECASTERS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "naive": naive_forecast,
+    "drift": drift_forecast,
+    "exp_smoothing": ses_forecast,
+    "ar": ar_forecast,
+}
+
+
+def backtest(prices: np.ndarray, horizon: int, window: int = WINDOW, max_origins: int = MAX_ORIGINS) -> Dict[str, float]:
+    """
+    Rolling-origin evaluation: at every origin each model forecasts ``horizon``
+    days from the preceding ``window`` days. Returns the MAPE in percent over
+    all origins and horizons per model; empty if the history is too short.
+    """
+    log_prices = np.log(np.asarray(prices, dtype=float))
+    n = len(log_prices)
+    if n < window + horizon:
+        return {}
+
+    windows = sliding_window_view(log_prices[:n - horizon], window)[-max_origins:]
+    actual = np.exp(sliding_window_view(log_prices[window:], horizon)[-max_origins:])
+
+    scores = {}
+    with np.errstate(over="ignore", invalid="ignore"):
+        for name, forecaster in FORECASTERS.items():
+            predicted = np.exp(forecaster(windows, horizon))
+            mape = float(np.mean(np.abs(predicted - actual) / actual) * 100)
+            scores[name] = mape if np.isfinite(mape) else float("inf")
+    return scores
+
+
+def auto_forecast(prices, horizon: int, window: int = WINDOW) -> Tuple[str, List[float], Optional[float], Dict[str, float]]:
+    """
+    Picks the model with the lowest backtest MAPE and forecasts ``horizon``
+    days from the most recent window. Returns (model, forecast, mape, all scores).
+    Without enough history for a backtest the drift model is used (mape None).
+    """
+    prices = np.asarray(prices, dtype=float)
+    prices = prices[np.isfinite(prices) & (prices > 0)]
+    if len(prices) < 2:
+        raise ValueError("at least two prices are needed for a forecast")
+
+    scores = backtest(prices, horizon, window)
+    model = min(scores, key=scores.get) if scores else "drift"
+    if model == "ar" and len(prices[-window:]) < AR_ORDER + 3:
+        model = "drift"
+
+    recent = np.log(prices[-window:])[None, :]
+    forecast = np.exp(FORECASTERS[model](recent, horizon))[0]
+    return model, [float(v) for v in forecast], scores.get(model), scores
@@ -0,0 +1,78 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from marketdatacache import MarketDataCache
+
+BASE_CURRENCY = "EUR"
+
+
+class FxRateStore:
+    """
+    Daily {CCY}EUR=X history per currency.
+
+    The full history of a pair is downloaded once through the market data
+    cache; afterwards only the tail is refreshed. The series are held in
+    memory as sorted NumPy arrays so that any number of (currency, date)
+    pairs can be resolved with one ``searchsorted`` per currency.
+    """
+
+    def __init__(self, market_data: MarketDataCache, refresh_after: timedelta = timedelta(hours=1)) -> None:
+        self.market_data = market_data
+        self.refresh_after = refresh_after
+        self._series: Dict[str, Tuple[np.ndarray, np.ndarray, datetime]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def pair_for(currency: str) -> str:
+        return f"{currency.upper()}{BASE_CURRENCY}=X"   # z.B. USDEUR=X, CHFEUR=X
+
+    def _rates_for(self, currency: str) -> Tuple[np.ndarray, np.ndarray, datetime]:
+        now = datetime.now()
+        with self._lock:
+            cached = self._series.get(currency)
+        if cached is not None and now - cached[2] < self.refresh_after:
+            return cached
+
+        # start=None -> full history on first use, tail-only refresh afterwards
+        data = self.market_data.get_history(self.pair_for(currency), None)
+        dates = data.index.values.astype("datetime64[D]")
+        rates = data["Close"].to_numpy(dtype=float)
+
+        entry = (dates, rates, now)
+        with self._lock:
+            self._series[currency] = entry
+        return entry
+
+    def get_rates(self, currencies: Sequence[str], dates: Sequence) -> np.ndarray:
+        """
+        As-of join: rate of the last trading day on or before each date.
+        Dates before the first quote use the first known rate.
+        Unknown currencies yield NaN.
+        """
+        currencies = np.asarray([str(c).upper() for c in currencies], dtype=object)
+        dates = pd.to_datetime(pd.Series(dates)).to_numpy().astype("datetime64[D]")
+
+        result = np.full(len(currencies), np.nan)
+        result[currencies == BASE_CURRENCY] = 1.0
+
+        for currency in set(currencies) - {BASE_CURRENCY}:
+            rate_dates, rates, _ = self._rates_for(currency)
+            if len(rates) == 0:
+                continue
+            mask = currencies == currency
+            pos = np.searchsorted(rate_dates, dates[mask], side="right") - 1
+            result[mask] = rates[np.clip(pos, 0, len(rates) - 1)]
+
+        return result
+
+    def convert_to_eur(self, amounts: Sequence[float], currencies: Sequence[str], dates: Sequence) -> np.ndarray:
+        """Vectorized conversion of many amounts; NaN where no rate is known."""
+        return np.asarray(amounts, dtype=float) * self.get_rates(currencies, dates)
+
+    def rate(self, currency: str, d) -> Optional[float]:
+        value = self.get_rates([currency], [d])[0]
+        return None if np.isnan(value) else float(value)
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+from databaseHandler import connection_pool, run_migrations
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# Lebensdauer gecachter Antworten in Sekunden (Standard 6 Stunden)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 6 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1000))
+
+MIGRATIONS = [
+    (1, [
+        """
+        CREATE TABLE IF NOT EXISTS llm_responses (
+            key TEXT PRIMARY KEY,          -- sha256 of (model, prompt, config)
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,      -- unix time
+            last_used REAL NOT NULL
+        );
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used);",
+    ]),
+]
+
+
+# --------- Backends ---------
+
+class GeminiBackend:
+    """Google Gemini; the client is created once on first use."""
+
+    def __init__(self, api_key: Optional[str] = None) -> None:
+        self.api_key = api_key or GEMINI_API_KEY
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                from google import genai
+                self._client = genai.Client(api_key=self.api_key)
+            return self._client
+
+    def generate(self, model: str, prompt: str, config: Optional[dict] = None) -> str:
+        response = self._get_client().models.generate_content(model=model, contents=prompt, config=config)
+        if response.text is None:
+            raise RuntimeError("empty response from Gemini")
+        return response.text
+
+
+class StubBackend:
+    """
+    Local stand-in for tests and offline runs. ``responses`` is either a fixed
+    answer, a dict prompt -> answer, or a callable (model, prompt, config) -> answer.
+    All calls are recorded in ``calls``.
+    """
+
+    def __init__(self, responses: Union[str, Dict[str, str], Callable[..., str]] = "Halten") -> None:
+        self.responses = responses
+        self.calls: List[tuple] = []
+
+    def generate(self, model: str, prompt: str, config: Optional[dict] = None) -> str:
+        self.calls.append((model, prompt, config))
+        if callable(self.responses):
+            return self.responses(model, prompt, config)
+        if isinstance(self.responses, dict):
+            return self.responses[prompt]
+        return self.responses
+
+
+# --------- Response cache ---------
+
+class LLMResponseCache:
+    """
+    Persistent response cache keyed by a hash of (model, prompt, config).
+    Entries expire after ``ttl`` seconds; beyond ``max_entries`` the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, db_path: str = "llmcache.db", ttl: float = LLM_CACHE_TTL, max_entries: int = LLM_CACHE_MAX_ENTRIES) -> None:
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        run_migrations(self.db_path, MIGRATIONS)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        return connection_pool.get(self.db_path)
+
+    @staticmethod
+    def make_key(model: str, prompt: str, config: Optional[dict] = None) -> str:
+        payload = json.dumps([model, prompt, config], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT response, created_at FROM llm_responses WHERE key = ?", (key,))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                cur.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                return None
+            cur.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                INSERT OR REPLACE INTO llm_responses (key, model, response, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, model, response, now, now),
+            )
+            # LRU: everything after the newest max_entries goes
+            cur.execute(
+                """
+                DELETE FROM llm_responses WHERE key IN (
+                    SELECT key FROM llm_responses
+                    ORDER BY last_used DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM llm_responses")
+
+
+# --------- Client ---------
+
+class CachedLLMClient:
+    """
+    Answers repeated (model, prompt, config) requests from the cache.
+    Errors are not cached, nor are responses rejected by ``validate``.
+    """
+
+    def __init__(self, backend, cache: Optional[LLMResponseCache] = None) -> None:
+        self.backend = backend
+        self.cache = cache
+
+    def generate(
+        self,
+        model: str,
+        prompt: str,
+        config: Optional[dict] = None,
+        validate: Optional[Callable[[str], object]] = None,
+    ) -> str:
+        if self.cache is None:
+            response = self.backend.generate(model, prompt, config)
+            if validate is not None:
+                validate(response)
+            return response
+
+        key = self.cache.make_key(model, prompt, config)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = self.backend.generate(model, prompt, config)
+        if validate is not None:
+            validate(response)   # raises -> not cached
+        self.cache.put(key, model, response)
+        return response
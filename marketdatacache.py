@@ -0,0 +1,524 @@
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from databaseHandler import connection_pool, run_migrations
+from marketdataprovider import OHLCV_COLUMNS, MarketDataProvider
+from resources import get_market_data_provider, get_ticker_metadata
+
+DateLike = Union[date, datetime, str]
+
+# earliest date we ask yfinance for (same lower bound yfinance uses for period="max")
+EARLIEST_DATE = date(1900, 1, 1)
+
+# yfinance period codes -> calendar days back from today (None = special handling)
+PERIOD_DAYS = {
+    "1mo": 31,
+    "3mo": 92,
+    "6mo": 183,
+    "1y": 366,
+    "2y": 731,
+    "5y": 1827,
+    "10y": 3653,
+    "ytd": None,
+    "max": None,
+}
+
+# short periods are counted in trading days, like yfinance does
+TRADING_DAY_PERIODS = {"1d": 1, "5d": 5}
+
+# Yahoo only serves intraday bars for a limited look-back window
+INTRADAY_LIMIT_DAYS = {
+    "1m": 7,
+    "2m": 59,
+    "5m": 59,
+    "15m": 59,
+    "30m": 59,
+    "60m": 729,
+    "90m": 59,
+    "1h": 729,
+}
+
+# coarser intervals are built locally from daily bars: interval -> pandas resample rule
+RESAMPLED_INTERVALS = {
+    "1wk": "W-MON",   # weeks starting Monday, like Yahoo
+    "1mo": "MS",      # calendar months, labelled with the 1st
+}
+
+# cached adjusted closes that differ by more than this share are re-based (split/dividend)
+ADJUSTMENT_TOLERANCE = 1e-4
+
+OHLCV_AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+MIGRATIONS = [
+    (1, [
+        # one row per bar
+        """
+        CREATE TABLE IF NOT EXISTS ohlcv (
+            symbol TEXT NOT NULL,
+            interval TEXT NOT NULL,
+            ts TEXT NOT NULL,          -- 'YYYY-MM-DD HH:MM:SS', UTC
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume REAL,
+            PRIMARY KEY (symbol, interval, ts)
+        ) WITHOUT ROWID;
+        """,
+        # covered date range per (symbol, interval), end_date exclusive
+        """
+        CREATE TABLE IF NOT EXISTS ohlcv_coverage (
+            symbol TEXT NOT NULL,
+            interval TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            fetched_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (symbol, interval)
+        );
+        """,
+    ]),
+]
+
+
+def _bucket_start(d: date, interval: str) -> date:
+    """First day of the week/month bar that contains d."""
+    if interval == "1wk":
+        return d - timedelta(days=d.weekday())
+    if interval == "1mo":
+        return d.replace(day=1)
+    return d
+
+
+def _resample(data: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Aggregates OHLCV bars into coarser bars labelled with the start of the bucket."""
+    if data.empty:
+        return data
+    bars = data.resample(rule, label="left", closed="left").agg(OHLCV_AGGREGATION)
+    bars.index.name = "Date"
+    return bars.dropna(subset=["Close"])
+
+
+def _daily_from_hourly(data: pd.DataFrame, timezone: str) -> pd.DataFrame:
+    """Daily bars from hourly UTC bars, grouped by the trading day in the exchange timezone."""
+    if data.empty:
+        return data
+    local = data.copy()
+    local.index = local.index.tz_localize("UTC").tz_convert(timezone).tz_localize(None)
+    return _resample(local, "D")
+
+
+def _to_date(value: DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+class MarketDataCache:
+    """
+    On-disk OHLCV cache keyed by (symbol, interval).
+
+    Every symbol/interval pair keeps one contiguous covered date range
+    [start_date, end_date). Requests only download the parts outside of
+    that range (plus the still-forming tail once it is older than
+    ``tail_ttl``) and merge them into the table.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "marketdata.db",
+        tail_ttl: timedelta = timedelta(minutes=15),
+        quote_ttl: timedelta = timedelta(seconds=60),
+        provider: Optional[MarketDataProvider] = None,
+    ) -> None:
+        self.db_path = db_path
+        self.provider = provider or get_market_data_provider()
+        self.tail_ttl = tail_ttl
+        self.quote_ttl = quote_ttl
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._quotes: Dict[str, Tuple[float, datetime]] = {}
+        self._quotes_lock = threading.Lock()
+        self._quotes_inflight: Dict[str, Future] = {}
+        self._ensure_db()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        return connection_pool.get(self.db_path)
+
+    def _ensure_db(self) -> None:
+        run_migrations(self.db_path, MIGRATIONS)
+
+    def _lock_for(self, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    # --------- Public API ---------
+
+    def get_history(
+        self,
+        symbol: str,
+        start: Optional[DateLike],
+        end: Optional[DateLike] = None,
+        interval: str = "1d",
+    ) -> pd.DataFrame:
+        """
+        Returns OHLCV bars for [start, end) and downloads only what is missing.
+        ``start=None`` means the full history, ``end=None`` means up to today.
+
+        Weekly and monthly bars are resampled from the cached daily bars, and
+        daily bars come from already cached hourly bars when those cover the
+        range, so switching the interval does not download the series again.
+        """
+        today = date.today()
+        start_d = _to_date(start) if start is not None else EARLIEST_DATE
+        end_d = _to_date(end) if end is not None else today + timedelta(days=1)
+        end_d = min(end_d, today + timedelta(days=1))
+
+        rule = RESAMPLED_INTERVALS.get(interval)
+        if rule is not None:
+            # start at the beginning of the first bar, so it is complete
+            daily_start = _bucket_start(start_d, interval) if start is not None else None
+            return _resample(self.get_history(symbol, daily_start, end, "1d"), rule)
+
+        limit = INTRADAY_LIMIT_DAYS.get(interval)
+        if limit is not None:
+            start_d = max(start_d, today - timedelta(days=limit))
+
+        if start_d >= end_d:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        if interval == "1d" and not self._covers(symbol, "1d", start_d, end_d):
+            daily = self._daily_from_cached_hourly(symbol, start_d, end_d)
+            if daily is not None:
+                return daily
+
+        with self._lock_for(symbol, interval):
+            self._sync(symbol, interval, start_d, end_d)
+            return self._read(symbol, interval, start_d, end_d)
+
+    def get_period(self, symbol: str, period: str, interval: str = "1d") -> pd.DataFrame:
+        """Same semantics as ``yf.download(symbol, period=..., interval=...)``."""
+        today = date.today()
+
+        if period in TRADING_DAY_PERIODS:
+            n_days = TRADING_DAY_PERIODS[period]
+            # a few extra calendar days to bridge weekends and holidays
+            data = self.get_history(symbol, today - timedelta(days=2 * n_days + 7), None, interval)
+            if data.empty:
+                return data
+            days = data.index.normalize().unique()
+            return data[data.index.normalize() >= days[-min(n_days, len(days))]]
+
+        if period == "max":
+            start = None
+        elif period == "ytd":
+            start = date(today.year, 1, 1)
+        elif period in PERIOD_DAYS:
+            start = today - timedelta(days=PERIOD_DAYS[period])
+        else:
+            raise ValueError(f"unknown period: {period}")
+
+        return self.get_history(symbol, start, None, interval)
+
+    def get_quotes(self, symbols: Sequence[str]) -> Dict[str, float]:
+        """
+        Latest close per symbol in its trading currency. All symbols whose
+        quote is older than ``quote_ttl`` are fetched with one multi-ticker
+        download; if that fails, the last cached daily close is used.
+
+        The lock only guards the quote dict: the download runs outside of it,
+        and symbols that another caller is already fetching are not fetched
+        again but taken from that caller's in-flight future.
+        """
+        now = datetime.now()
+        symbols = list(dict.fromkeys(symbols))
+
+        own: List[str] = []
+        waiting: Dict[str, Future] = {}
+        with self._quotes_lock:
+            quotes = {s: self._quotes[s][0] for s in symbols if s in self._quotes and now - self._quotes[s][1] < self.quote_ttl}
+            for symbol in symbols:
+                if symbol in quotes:
+                    continue
+                future = self._quotes_inflight.get(symbol)
+                if future is None:
+                    future = self._quotes_inflight[symbol] = Future()
+                    own.append(symbol)
+                waiting[symbol] = future
+
+        if own:
+            fetched: Dict[str, float] = {}
+            try:
+                fetched = self._download_quotes(own)
+                for symbol in own:
+                    if fetched.get(symbol) is None:
+                        price = self._last_cached_close(symbol)
+                        if price is not None:
+                            fetched[symbol] = price
+            finally:
+                # Wartende nie hängen lassen, auch wenn der Fallback scheitert
+                with self._quotes_lock:
+                    for symbol in own:
+                        price = fetched.get(symbol)
+                        if price is not None:
+                            self._quotes[symbol] = (price, now)
+                        self._quotes_inflight.pop(symbol).set_result(price)
+
+        for symbol, future in waiting.items():
+            price = future.result()
+            if price is not None:
+                quotes[symbol] = price
+
+        return quotes
+
+    # --------- Internals ---------
+
+    def _download_quotes(self, symbols: List[str]) -> Dict[str, float]:
+        try:
+            frames = self.provider.history_many(symbols, period="5d", interval="1d")
+        except Exception as e:
+            print(f"Quote download failed: {e}")
+            return {}
+
+        return {symbol: float(data["Close"].iloc[-1]) for symbol, data in frames.items() if not data.empty}
+
+    def _last_cached_close(self, symbol: str) -> Optional[float]:
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT close FROM ohlcv
+                WHERE symbol = ? AND interval = '1d'
+                ORDER BY ts DESC
+                LIMIT 1
+                """,
+                (symbol,),
+            )
+            row = cur.fetchone()
+            return row[0] if row else None
+
+
+    def _daily_from_cached_hourly(self, symbol: str, start: date, end: date) -> Optional[pd.DataFrame]:
+        """
+        Daily bars from cached hourly bars (not stored as '1d'); None if those
+        do not cover the range or the exchange timezone is unknown. A trading
+        day can span two UTC days (e.g. ASX, TSE), so the hourly bars are read
+        with one day of margin and grouped in the exchange timezone.
+        """
+        if not self._covers(symbol, "1h", start - timedelta(days=1), end):
+            return None
+        try:
+            timezone = get_ticker_metadata().timezone(symbol)
+        except Exception as e:
+            print(f"Exchange timezone lookup failed for {symbol}: {e}")
+            return None
+        if not timezone:
+            return None
+
+        hourly = self._read(symbol, "1h", start - timedelta(days=1), end + timedelta(days=1))
+        daily = _daily_from_hourly(hourly, timezone)
+        return daily[(daily.index >= pd.Timestamp(start)) & (daily.index < pd.Timestamp(end))]
+
+    def _get_coverage(self, symbol: str, interval: str):
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT start_date, end_date, fetched_at
+                FROM ohlcv_coverage
+                WHERE symbol = ? AND interval = ?
+                """,
+                (symbol, interval),
+            )
+            row = cur.fetchone()
+            if not row:
+                return None
+            return _to_date(row[0]), _to_date(row[1]), datetime.fromisoformat(row[2])
+
+    def _covers(self, symbol: str, interval: str, start: date, end: date) -> bool:
+        """True if [start, end) is cached and _sync would not download anything."""
+        coverage = self._get_coverage(symbol, interval)
+        if coverage is None:
+            return False
+        cov_start, cov_end, fetched_at = coverage
+        stale = datetime.now() - fetched_at > self.tail_ttl and end > fetched_at.date()
+        return cov_start <= start and end <= cov_end and not stale
+
+    def _sync(self, symbol: str, interval: str, start: date, end: date) -> None:
+        coverage = self._get_coverage(symbol, interval)
+        now = datetime.now()
+
+        if coverage is None:
+            if self._fetch_and_store(symbol, interval, start, end):
+                self._set_coverage(symbol, interval, start, end, now)
+            return
+
+        cov_start, cov_end, fetched_at = coverage
+        new_start, new_end, new_fetched_at = cov_start, cov_end, fetched_at
+
+        # missing head
+        if start < cov_start:
+            if self._fetch_and_store(symbol, interval, start, cov_start):
+                new_start = start
+
+        # missing or stale tail: bars from the day of the last fetch on may have been incomplete
+        fetched_day = fetched_at.date()
+        stale = now - fetched_at > self.tail_ttl and end > fetched_day
+        if end > cov_end or stale:
+            tail_start = min(cov_end, fetched_day) if stale else cov_end
+            tail_end = max(end, cov_end)
+
+            # start one cached bar earlier: if its adjusted close changed, a split or
+            # dividend re-based the whole series and the cached bars are outdated
+            anchor = self._last_bar_before(symbol, interval, tail_start)
+            fetch_start = min(tail_start, _to_date(anchor[0])) if anchor else tail_start
+            data = self._download(symbol, interval, fetch_start, tail_end)
+
+            if data is not None and anchor is not None and self._adjustment_changed(data, anchor):
+                print(f"Adjusted prices of {symbol} ({interval}) changed, reloading the cached range")
+                self._drop(symbol, interval)
+                if self._fetch_and_store(symbol, interval, new_start, tail_end):
+                    self._set_coverage(symbol, interval, new_start, tail_end, now)
+                return
+
+            if self._accept(symbol, data, fetch_start, tail_end):
+                self._store(symbol, interval, data)
+                new_end = tail_end
+                new_fetched_at = now
+
+        if (new_start, new_end, new_fetched_at) != (cov_start, cov_end, fetched_at):
+            self._set_coverage(symbol, interval, new_start, new_end, new_fetched_at)
+
+    def _fetch_and_store(self, symbol: str, interval: str, start: date, end: date) -> bool:
+        """True if [start, end) may be marked as covered."""
+        data = self._download(symbol, interval, start, end)
+        if not self._accept(symbol, data, start, end):
+            return False
+        self._store(symbol, interval, data)
+        return True
+
+    @staticmethod
+    def _accept(symbol: str, data: Optional[pd.DataFrame], start: date, end: date) -> bool:
+        """
+        A download counts only if it returned bars, or if no bars were due:
+        yfinance does not raise on network errors or rate limits but returns
+        an empty frame, which must not mark completed trading days as covered.
+        """
+        if data is None:
+            return False
+        if not data.empty:
+            return True
+        # completed weekdays in the range (today's bar may not exist yet)
+        day, last = start, min(end, date.today())
+        while day < last:
+            if day.weekday() < 5:
+                print(f"Empty download for {symbol} ({start} - {end}), not cached")
+                return False
+            day += timedelta(days=1)
+        return True
+
+    def _download(self, symbol: str, interval: str, start: date, end: date) -> Optional[pd.DataFrame]:
+        try:
+            return self.provider.history(
+                symbol,
+                start=start.strftime("%Y-%m-%d"),
+                end=end.strftime("%Y-%m-%d"),
+                interval=interval,
+            )
+        except Exception as e:
+            print(f"Download failed for {symbol} ({interval}): {e}")
+            return None
+
+    def _store(self, symbol: str, interval: str, data: pd.DataFrame) -> None:
+        if data.empty:
+            return
+
+        timestamps = data.index.strftime("%Y-%m-%d %H:%M:%S")
+        values = data.reindex(columns=OHLCV_COLUMNS).astype(float)
+        values = values.astype(object).where(values.notna(), None)
+        rows = [
+            (symbol, interval, ts, *bar)
+            for ts, bar in zip(timestamps, values.itertuples(index=False, name=None))
+        ]
+
+        with self._get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO ohlcv
+                (symbol, interval, ts, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.commit()
+
+    def _last_bar_before(self, symbol: str, interval: str, day: date) -> Optional[Tuple[str, float]]:
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT ts, close FROM ohlcv
+                WHERE symbol = ? AND interval = ? AND ts < ? AND close IS NOT NULL
+                ORDER BY ts DESC
+                LIMIT 1
+                """,
+                (symbol, interval, day.isoformat()),
+            )
+            return cur.fetchone()
+
+    @staticmethod
+    def _adjustment_changed(data: pd.DataFrame, anchor: Tuple[str, float]) -> bool:
+        ts, cached_close = anchor
+        if data.empty:
+            return False
+        matches = data.index.strftime("%Y-%m-%d %H:%M:%S") == ts
+        if not matches.any():
+            return False
+        close = float(data["Close"][matches].iloc[0])
+        # relative tolerance for rounding differences between downloads
+        return close == close and abs(close - cached_close) > ADJUSTMENT_TOLERANCE * abs(cached_close)
+
+    def _drop(self, symbol: str, interval: str) -> None:
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM ohlcv WHERE symbol = ? AND interval = ?", (symbol, interval))
+            conn.execute("DELETE FROM ohlcv_coverage WHERE symbol = ? AND interval = ?", (symbol, interval))
+            conn.commit()
+
+    def _set_coverage(self, symbol: str, interval: str, start: date, end: date, fetched_at: datetime) -> None:
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO ohlcv_coverage
+                (symbol, interval, start_date, end_date, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (symbol, interval, start.isoformat(), end.isoformat(), fetched_at.isoformat()),
+            )
+            conn.commit()
+
+    def _read(self, symbol: str, interval: str, start: date, end: date) -> pd.DataFrame:
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT ts, open, high, low, close, volume
+                FROM ohlcv
+                WHERE symbol = ? AND interval = ? AND ts >= ? AND ts < ?
+                ORDER BY ts
+                """,
+                (symbol, interval, start.isoformat(), end.isoformat()),
+            )
+            rows = cur.fetchall()
+
+        data = pd.DataFrame(rows, columns=["ts"] + OHLCV_COLUMNS)
+        index = pd.DatetimeIndex(pd.to_datetime(data.pop("ts")))
+        index.name = "Datetime" if interval in INTRADAY_LIMIT_DAYS else "Date"
+        data.index = index
+        return data
@@ -0,0 +1,399 @@
+"""
+Single access point for all market data requests (yfinance).
+
+Every download, ticker info and symbol search goes through a provider:
+
+* ``YFinanceProvider`` talks to Yahoo Finance.
+* ``CoalescingProvider`` wraps another provider. Identical requests that are
+  in flight at the same time (e.g. two Streamlit sessions opening the same
+  symbol) share one call, and single-symbol history requests for the same
+  range arriving within ``batch_window`` are merged into one multi-ticker
+  download.
+* ``RecordingProvider`` / ``ReplayProvider`` store responses on disk and serve
+  them later without network access (``MARKET_DATA_MODE=record`` / ``replay``).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# live | record | replay
+MARKET_DATA_MODE = os.getenv("MARKET_DATA_MODE", "live")
+MARKET_DATA_RECORDINGS = os.getenv("MARKET_DATA_RECORDINGS", "recordings")
+
+
+def _normalize_download(data: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Brings a yf.download result into a flat, tz-naive OHLCV frame."""
+    if data is None or data.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+    data = data.copy()
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+
+    if isinstance(data.index, pd.DatetimeIndex) and data.index.tz is not None:
+        data.index = data.index.tz_convert("UTC").tz_localize(None)
+
+    data = data.loc[:, [c for c in OHLCV_COLUMNS if c in data.columns]]
+    if "Close" not in data:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    return data.dropna(subset=["Close"])
+
+
+def _split_download(raw: Optional[pd.DataFrame], symbols: Sequence[str]) -> Dict[str, pd.DataFrame]:
+    """Splits a multi-ticker download (group_by='ticker') into one frame per symbol."""
+    result = {}
+    for symbol in symbols:
+        part = None
+        if raw is not None and not raw.empty:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if symbol in raw.columns.get_level_values(0):
+                    part = raw[symbol]
+                elif symbol in raw.columns.get_level_values(1):
+                    part = raw.xs(symbol, axis=1, level=1)
+            elif len(symbols) == 1:
+                part = raw
+        result[symbol] = _normalize_download(part)
+    return result
+
+
+class MarketDataProvider(ABC):
+    """
+    Interface of all providers. ``start``/``end`` are 'YYYY-MM-DD' strings,
+    alternatively ``period`` (e.g. '5d') like in yf.download.
+    """
+
+    @abstractmethod
+    def history_many(
+        self,
+        symbols: Sequence[str],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        interval: str = "1d",
+        period: Optional[str] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        ...
+
+    def history(
+        self,
+        symbol: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        interval: str = "1d",
+        period: Optional[str] = None,
+    ) -> pd.DataFrame:
+        return self.history_many([symbol], start, end, interval, period)[symbol]
+
+    @abstractmethod
+    def info(self, symbol: str) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def search(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
+        ...
+
+
+# --------- Yahoo Finance ---------
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance via yfinance; the package is imported on first use."""
+
+    @staticmethod
+    def _yf():
+        import yfinance as yf
+        return yf
+
+    def history_many(self, symbols, start=None, end=None, interval="1d", period=None):
+        symbols = list(dict.fromkeys(symbols))
+        raw = self._yf().download(
+            symbols,
+            start=start,
+            end=end,
+            period=period,
+            interval=interval,
+            auto_adjust=True,
+            progress=False,
+            group_by="ticker",
+        )
+        return _split_download(raw, symbols)
+
+    def info(self, symbol):
+        return getattr(self._yf().Ticker(symbol), "info", {}) or {}
+
+    def search(self, query, max_results=10):
+        return list(self._yf().Search(query, max_results=max_results).quotes or [])
+
+
+# --------- Coalescing ---------
+
+class _Batch:
+    def __init__(self) -> None:
+        self.futures: Dict[str, Future] = {}
+
+
+class CoalescingProvider(MarketDataProvider):
+    """
+    Single-flight and batching in front of another provider.
+
+    Every request has a key; while a request with the same key is running,
+    further callers wait for its result instead of sending their own.
+    History requests with the same (start, end, interval, period) are
+    collected for ``batch_window`` seconds (at most ``max_batch`` symbols)
+    and sent as one ``history_many`` call.
+    """
+
+    def __init__(self, inner: MarketDataProvider, batch_window: float = 0.05, max_batch: int = 50) -> None:
+        self.inner = inner
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._inflight: Dict[tuple, Future] = {}
+        self._batches: Dict[tuple, _Batch] = {}
+
+    def history_many(self, symbols, start=None, end=None, interval="1d", period=None):
+        symbols = list(dict.fromkeys(symbols))
+        futures = self._submit_history(symbols, (start, end, interval, period))
+        return {symbol: future.result().copy() for symbol, future in futures.items()}
+
+    def info(self, symbol):
+        return self._single_flight(("info", symbol), lambda: self.inner.info(symbol))
+
+    def search(self, query, max_results=10):
+        return self._single_flight(("search", query, max_results), lambda: self.inner.search(query, max_results))
+
+    # --------- Internals ---------
+
+    def _single_flight(self, key: tuple, call: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if leader:
+            try:
+                future.set_result(call())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        return future.result()
+
+    def _submit_history(self, symbols: List[str], params: tuple) -> Dict[str, Future]:
+        futures: Dict[str, Future] = {}
+        own: List[str] = []
+        with self._lock:
+            for symbol in symbols:
+                key = ("history", symbol) + params
+                future = self._inflight.get(key)
+                if future is None:
+                    future = self._inflight[key] = Future()
+                    own.append(symbol)
+                futures[symbol] = future
+
+            # a multi-symbol request is already a batch; single symbols wait for company
+            batch = None
+            if len(own) == 1:
+                batch = self._batches.get(params)
+                if batch is not None and len(batch.futures) < self.max_batch:
+                    batch.futures[own[0]] = futures[own[0]]
+                    own = []
+                else:
+                    batch = self._batches[params] = _Batch()
+                    batch.futures[own[0]] = futures[own[0]]
+
+        if batch is not None and own:
+            # leader of a new batch: collect, then download for everyone
+            time.sleep(self.batch_window)
+            with self._lock:
+                if self._batches.get(params) is batch:
+                    del self._batches[params]
+            self._run_history(dict(batch.futures), params)
+        elif own:
+            self._run_history({symbol: futures[symbol] for symbol in own}, params)
+
+        return futures
+
+    def _run_history(self, futures: Dict[str, Future], params: tuple) -> None:
+        start, end, interval, period = params
+        try:
+            frames = self.inner.history_many(list(futures), start, end, interval, period)
+            for symbol, future in futures.items():
+                future.set_result(frames.get(symbol, pd.DataFrame(columns=OHLCV_COLUMNS)))
+        except BaseException as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                for symbol in futures:
+                    self._inflight.pop(("history", symbol) + params, None)
+
+
+# --------- Record / replay ---------
+
+class ReplayMiss(LookupError):
+    """The requested data is not part of the recording."""
+
+
+def _recording_key(*parts: Any) -> str:
+    return hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def _period_start(series_end: pd.Timestamp, period: str, index: pd.DatetimeIndex) -> pd.Timestamp:
+    """First timestamp of a yf-style period ('5d', '1mo', '1y', 'max') ending with the recording."""
+    if index.empty:
+        return series_end
+    if period == "max":
+        return index.min()
+
+    unit = "mo" if period.endswith("mo") else period[-1]
+    count = int(period[:-len(unit)])
+    if unit == "d":
+        # Handelstage, nicht Kalendertage
+        days = index.normalize().unique()
+        return days[-min(count, len(days))]
+    return series_end - pd.Timedelta(days=count * {"mo": 31, "y": 366}[unit])
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves responses recorded by RecordingProvider from ``directory``.
+
+    History is recorded as one series per (symbol, interval) plus the
+    requested date range it covers, so any slice inside that range can be
+    replayed on any later day; data after the end of the recording does not
+    exist for the replay. Requests outside of the recording raise ReplayMiss,
+    or go to ``fallback`` if set.
+    """
+
+    def __init__(self, directory: str = MARKET_DATA_RECORDINGS, fallback: Optional[MarketDataProvider] = None) -> None:
+        self.directory = Path(directory)
+        self.fallback = fallback
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{key}.{suffix}"
+
+    def history_many(self, symbols, start=None, end=None, interval="1d", period=None):
+        result = {}
+        missing = []
+        for symbol in symbols:
+            try:
+                result[symbol] = self._slice(symbol, start, end, interval, period)
+            except ReplayMiss:
+                if self.fallback is None:
+                    raise
+                missing.append(symbol)
+
+        if missing:
+            result.update(self.fallback.history_many(missing, start, end, interval, period))
+        return result
+
+    def _slice(self, symbol, start, end, interval, period) -> pd.DataFrame:
+        key = _recording_key("history", symbol, interval)
+        data_path, span_path = self._path(key, "csv"), self._path(key, "json")
+        if not data_path.exists() or not span_path.exists():
+            raise ReplayMiss(f"no recording for {symbol} ({interval})")
+
+        span = json.loads(span_path.read_text(encoding="utf-8"))
+        data = pd.read_csv(data_path, index_col=0, parse_dates=True)
+        if period is not None:
+            return data[data.index >= _period_start(pd.Timestamp(span["end"]), period, data.index)]
+
+        if start is not None and not span["start"] <= start < span["end"]:
+            raise ReplayMiss(f"{symbol} ({interval}) from {start} is outside the recording {span['start']} - {span['end']}")
+        if start is not None:
+            data = data[data.index >= pd.Timestamp(start)]
+        if end is not None:
+            data = data[data.index < pd.Timestamp(end)]
+        return data
+
+    def _load_json(self, key: str, call: Callable[[], Any], what: str) -> Any:
+        path = self._path(key, "json")
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+        if self.fallback is None:
+            raise ReplayMiss(f"no recording for {what}")
+        return call()
+
+    def info(self, symbol):
+        return self._load_json(_recording_key("info", symbol), lambda: self.fallback.info(symbol), f"info of {symbol}")
+
+    def search(self, query, max_results=10):
+        return self._load_json(
+            _recording_key("search", query, max_results), lambda: self.fallback.search(query, max_results), f"search '{query}'")
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Passes requests to ``inner`` and writes every response to ``directory``.
+    History responses are merged into one series per (symbol, interval).
+    """
+
+    def __init__(self, inner: MarketDataProvider, directory: str = MARKET_DATA_RECORDINGS) -> None:
+        self.inner = inner
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def history_many(self, symbols, start=None, end=None, interval="1d", period=None):
+        frames = self.inner.history_many(symbols, start, end, interval, period)
+        with self._lock:
+            for symbol, frame in frames.items():
+                self._merge(symbol, interval, frame, start, end)
+        return frames
+
+    def _merge(self, symbol: str, interval: str, frame: pd.DataFrame, start: Optional[str], end: Optional[str]) -> None:
+        key = _recording_key("history", symbol, interval)
+        data_path, span_path = self.directory / f"{key}.csv", self.directory / f"{key}.json"
+
+        if start is None or end is None:
+            # period request: the range is what came back
+            if frame.empty:
+                return
+            start = start or frame.index.min().strftime("%Y-%m-%d")
+            end = end or (frame.index.max() + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+
+        if data_path.exists() and span_path.exists():
+            recorded = pd.read_csv(data_path, index_col=0, parse_dates=True)
+            frame = pd.concat([recorded, frame])
+            frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+            span = json.loads(span_path.read_text(encoding="utf-8"))
+            start, end = min(start, span["start"]), max(end, span["end"])
+
+        frame.to_csv(data_path)
+        span_path.write_text(json.dumps({"symbol": symbol, "interval": interval, "start": start, "end": end}), encoding="utf-8")
+
+    def _save_json(self, key: str, value: Any) -> Any:
+        (self.directory / f"{key}.json").write_text(json.dumps(value, default=str), encoding="utf-8")
+        return value
+
+    def info(self, symbol):
+        return self._save_json(_recording_key("info", symbol), self.inner.info(symbol))
+
+    def search(self, query, max_results=10):
+        return self._save_json(_recording_key("search", query, max_results), self.inner.search(query, max_results))
+
+
+def create_provider(mode: str = MARKET_DATA_MODE, directory: str = MARKET_DATA_RECORDINGS) -> MarketDataProvider:
+    """Provider for ``mode`` (live, record or replay), with coalescing in front."""
+    if mode == "replay":
+        inner: MarketDataProvider = ReplayProvider(directory)
+    elif mode == "record":
+        inner = RecordingProvider(YFinanceProvider(), directory)
+    elif mode == "live":
+        inner = YFinanceProvider()
+    else:
+        raise ValueError(f"unknown MARKET_DATA_MODE: {mode}")
+    return CoalescingProvider(inner)
+
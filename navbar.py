@@ -1,13 +1,11 @@
 import streamlit as st
-from authentication import Authentication
+from resources import get_authentication
 from pages.dashboard import show_dashboard
 
-auth = Authentication()
-
 def render_top_navbar():
     """Render the top navigation bar with login/logout functionality."""
 
-    user = auth.get_logged_in_user()
+    user = get_authentication().get_logged_in_user(st.session_state)
 
     with st.container():
         st.markdown(
@@ -47,7 +45,8 @@ def _render_logged_in_user(user):
 
     with col2:
         if st.button("Logout"):
-            auth.logout()
+            # entfernt auch PortfolioManager und Analysen des abgemeldeten Nutzers
+            get_authentication().logout(st.session_state)
             st.session_state.page = "dashboard"
             st.rerun()
 
@@ -60,7 +59,7 @@ def _render_login_form():
         submitted = st.form_submit_button("Einloggen")  
 
         if submitted:
-            user = auth.login(username, password) 
+            user = get_authentication().login(username, password, st.session_state) 
             if user:
                 st.success("Erfolgreich eingeloggt!")  
                 st.session_state.page = "dashboard"  
@@ -1,9 +1,11 @@
+from datetime import datetime
+
 import streamlit as st
-import yfinance as yf
-import pandas as pd
 import plotly.graph_objects as go
 from prognose_analyse import prognose_analyse
-import matplotlib.pyplot as plt
+from chartdata import scatter_class
+from precompute import prognose_ergebnis
+from resources import get_chart_cache, get_database, get_market_data_cache, get_precompute_scheduler, get_symbol_search
 
 
 def load_data(symbol, period, interval):
@@ -12,10 +14,8 @@ def load_data(symbol, period, interval):
         return
 
     try:
-        data = yf.download(symbol, period=period, interval=interval, progress=False)
-
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.get_level_values(0)
+        # lokaler Cache, lädt nur fehlende Zeiträume nach
+        data = get_market_data_cache().get_period(symbol, period, interval)
 
         if data.empty:
             st.error(f"Keine Daten gefunden für {symbol} mit Periode {period} und Intervall {interval}.")
@@ -33,9 +33,29 @@ def load_data(symbol, period, interval):
         st.session_state["data"] = None
 
 
+def _zeige_stand(ergebnis):
+    # Alter eines vorberechneten Ergebnisses (frisch berechnete haben keinen Zeitstempel)
+    computed_at = ergebnis.get("computed_at")
+    if computed_at is None:
+        return
+    minuten = int((datetime.now() - computed_at).total_seconds() // 60)
+    if minuten < 1:
+        alter = "gerade eben"
+    elif minuten < 60:
+        alter = f"vor {minuten} Min."
+    elif minuten < 48 * 60:
+        alter = f"vor {minuten // 60} Std."
+    else:
+        alter = f"vor {minuten // (24 * 60)} Tagen"
+    st.caption(f"Vorberechnet {alter} ({computed_at:%d.%m.%Y %H:%M})")
+
+
 def show_dashboard():
     
-    prog_ana_data = prognose_analyse()
+    # ein Objekt pro Session statt pro Rerun; Caches und LLM-Client sind prozessweit geteilt
+    if "prognose_analyse" not in st.session_state:
+        st.session_state["prognose_analyse"] = prognose_analyse()
+    prog_ana_data = st.session_state["prognose_analyse"]
     query = st.text_input(
         "Gib Aktien- oder Krypto-Ticker oder Namen ein",
         placeholder="z. B. apple, bitcoin, AAPL, BTC-USD",
@@ -45,8 +65,7 @@ def show_dashboard():
     if query:
         try:
             if "last_query" not in st.session_state or st.session_state["last_query"] != query:
-                result = yf.Search(query, max_results=10)
-                st.session_state["search_quotes"] = result.quotes
+                st.session_state["search_quotes"] = get_symbol_search().search(query, limit=10)
                 st.session_state["last_query"] = query
 
             quotes = st.session_state["search_quotes"]
@@ -57,7 +76,7 @@ def show_dashboard():
 
                 for quote in quotes:
                     symbol = quote["symbol"]
-                    name = quote.get("shortname", "N/A")
+                    name = quote.get("shortname") or "N/A"
                     label = f"{symbol} – {name}"
                     selection_options.append(label)
                     symbol_map[label] = symbol
@@ -165,9 +184,11 @@ def show_dashboard():
         c2.metric("Veränderung", f"{pct:.2f} %")
         c3.metric("Datenpunkte", len(data))
 
-        fig = go.Figure(data=[go.Scatter(
-            x=data.index,
-            y=data["Close"],
+        # höchstens MAX_CHART_POINTS Punkte an den Browser (LTTB), gecacht pro Symbol/Periode/Intervall
+        close = get_chart_cache().get(symbol, st.session_state["period"], st.session_state["interval"], data["Close"])
+        fig = go.Figure(data=[scatter_class(len(data))(
+            x=close.index,
+            y=close.values,
             mode="lines",
             name="Close"
         )])
@@ -182,67 +203,91 @@ def show_dashboard():
             col1, col2 = st.columns(2)
 
             if st.button("Prognose und Analyse ausführen"):
-                # update data in objekt für prognose und analyse 
-                prog_ana_data.update(symbol)
-
-                with st.spinner('Prognose und Analyse läuft...'):                   
-                    with col1:
-                        st.subheader("Prognose Kursentwicklung")
-
-                        progdata, predictions, pred_days = prog_ana_data.get_prediction()
-                    
-                        figProg = go.Figure()
+                with st.spinner('Prognose und Analyse läuft...'):
+                    # update data in objekt für prognose und analyse (Stufen laufen nebenläufig)
+                    prog_ana_data.update(symbol)
+                    # frisches Ergebnis auch für die nächsten Aufrufe speichern
+                    get_precompute_scheduler().store(symbol, prog_ana_data)
+                prognose = prognose_ergebnis(prog_ana_data)
+                empfehlung, news = prog_ana_data.get_sentiment()
+                # auch den Platzhalter anzeigen, wenn das LLM nicht erreichbar war
+                sentiment = {"empfehlung": empfehlung, "stichwoerter": news, "konfidenz": prog_ana_data.get_konfidenz()}
+            else:
+                # vorberechnet im Hintergrund (precompute.py), sofort verfügbar
+                db = get_database()
+                prognose = db.get_precomputed_forecast(symbol)
+                sentiment = db.get_precomputed_sentiment(symbol)
+                if prognose is None and sentiment is None:
+                    st.info("Noch keine vorberechnete Analyse für dieses Symbol vorhanden.")
+                    return
+
+            with col1:
+                st.subheader("Prognose Kursentwicklung")
+
+                if prognose is None:
+                    st.warning("Prognose derzeit nicht verfügbar.")
+                else:
+                    figProg = go.Figure()
                         
-                        # historischer Kursverlauf
-                        figProg.add_trace(go.Scatter(
-                                x = progdata.index,
-                                y = progdata[symbol].values,
-                                mode="lines",
-                                name="Historie"))
+                    # historischer Kursverlauf
+                    figProg.add_trace(go.Scatter(
+                            x = prognose["hist_dates"],
+                            y = prognose["hist_values"],
+                            mode="lines",
+                            name="Historie"))
     
-                        # 7-tagesprognose
-                        figProg.add_trace(go.Scatter(
-                                x = pred_days,
-                                y = predictions,
-                                mode="lines",
-                                name="Vorhersage"))
+                    # 7-tagesprognose
+                    figProg.add_trace(go.Scatter(
+                            x = prognose["pred_days"],
+                            y = prognose["predictions"],
+                            mode="lines",
+                            name="Vorhersage"))
                         
-                        # 7-tageskursziel
-                        figProg.add_trace(go.Scatter(
-                                x = [progdata.index[0], pred_days[-1]],
-                                y = [predictions[-1], predictions[-1]],
-                                mode="lines",
-                                name="Kursziel"))
+                    # 7-tageskursziel
+                    figProg.add_trace(go.Scatter(
+                            x = [prognose["hist_dates"][0], prognose["pred_days"][-1]],
+                            y = [prognose["predictions"][-1], prognose["predictions"][-1]],
+                            mode="lines",
+                            name="Kursziel"))
                         
                      
-                        figProg.update_layout(
-                            title="Kursentwicklung und Vorhersage",
-                            xaxis_title="Datum",
-                            yaxis_title="Kurs",
-                            legend_title="Legende",
-                            template="plotly_dark",
-                        )
-                        st.plotly_chart(figProg, width='stretch')
-
-                    with col2:
-                        st.subheader("News-basierte Handlungsempfehlung:")
-
-                        empfehlung, news = prog_ana_data.get_sentiment()
-                                           
-                        # Darstellung Empfehlung
-                        st.markdown(
-                            f"""
-                            <div style="text-align: center; margin-top: 50px; font-size: 24px;">
-                                {empfehlung}
-                            </div>
-                            """, unsafe_allow_html=True)
-                        # Anzeige der wichtigsten News-Stichwörter
-                        st.markdown(
-                            f"""
-                            <div style="text-align: center; margin-top: 50px; font-size: 12px;">
-                                {news}
-                            </div>
-                            """, unsafe_allow_html=True)
+                    figProg.update_layout(
+                        title="Kursentwicklung und Vorhersage",
+                        xaxis_title="Datum",
+                        yaxis_title="Kurs",
+                        legend_title="Legende",
+                        template="plotly_dark",
+                    )
+                    st.plotly_chart(figProg, width='stretch')
+                    _zeige_stand(prognose)
+
+            with col2:
+                st.subheader("News-basierte Handlungsempfehlung:")
+
+                if sentiment is None:
+                    st.warning("Handlungsempfehlung derzeit nicht verfügbar.")
+                else:
+                    # Darstellung Empfehlung
+                    st.markdown(
+                        f"""
+                        <div style="text-align: center; margin-top: 50px; font-size: 24px;">
+                            {sentiment["empfehlung"]}
+                        </div>
+                        """, unsafe_allow_html=True)
+                    if sentiment["konfidenz"] is not None:
+                        st.caption(f"Konfidenz: {sentiment['konfidenz']:.0%}")
+                    if prognose is not None and prognose["modell"] and prognose["mape"] is not None:
+                        st.caption(f"Prognosemodell: {prognose['modell']} (Backtest-MAPE {prognose['mape']:.1f} %)")
+                    elif prognose is not None and prognose["modell"]:
+                        st.caption(f"Prognosemodell: {prognose['modell']}")
+                    # Anzeige der wichtigsten News-Stichwörter
+                    st.markdown(
+                        f"""
+                        <div style="text-align: center; margin-top: 50px; font-size: 12px;">
+                            {sentiment["stichwoerter"]}
+                        </div>
+                        """, unsafe_allow_html=True)
+                    _zeige_stand(sentiment)
 
                 
                 
@@ -1,118 +1,60 @@
 import datetime
+import io
+import time
 import streamlit as st
-import yfinance as yf
+import plotly.graph_objects as go
 import pandas as pd
 
-from databaseHandler import DatabaseAdministration
 from portfoliomanager import Portfolio, PortfolioManager
-from authentication import Authentication
-
-
-ua = DatabaseAdministration()
-auth = Authentication()
+from resources import get_authentication, get_fx_rate_store, get_market_data_cache, get_symbol_search, get_ticker_metadata
+from assetimport import infer_asset_type
+from valuation import value_portfolio
+from chartdata import downsample, scatter_class
+from portfoliohistory import value_history
+from prognose_analyse import prognose_batch
 
 
 def _fetch_yf_name(symbol: str) -> str | None:
-    try:
-        ticker = yf.Ticker(symbol)
-        info = getattr(ticker, "info", {}) or {}
-        return info.get("shortName") or info.get("longName")
-    except Exception:
-        return None
+    return get_ticker_metadata().name(symbol)
 
 def _get_ticker_currency(symbol: str) -> str | None:
     """
     Liefert die Handelswährung des Symbols laut yfinance, z.B. 'USD', 'EUR', 'CHF'.
+    Name, Währung und Typ kommen aus demselben gespeicherten info-Abruf.
     """
-    try:
-        t = yf.Ticker(symbol)
-        info = getattr(t, "info", {}) or {}
-        return info.get("currency")
-    except Exception:
-        return None
+    return get_ticker_metadata().currency(symbol)
 
 
 def _convert_to_eur(price: float, currency: str, d: datetime.date) -> float | None:
     """
     Rechnet price in 'currency' nach EUR um.
-    Nutzt FX-Ticker wie 'USDEUR=X', 'CHFEUR=X' etc.
+    Nutzt die gespeicherte Tageshistorie von FX-Tickern wie 'USDEUR=X', 'CHFEUR=X' etc.
     Gibt None zurück, wenn kein Kurs gefunden wird.
     """
-    currency = currency.upper()
-    if currency == "EUR":
-        return price
-
-    pair = f"{currency}EUR=X"   # z.B. USDEUR=X, CHFEUR=X
+    if price is None:
+        return None
 
     try:
-        end = d + datetime.timedelta(days=1)
-        start = d - datetime.timedelta(days=7)
-
-        data = yf.download(
-            pair,
-            start=start,
-            end=end,
-            interval="1d",
-            progress=False,
-        )
-
-        if data is None or data.empty:
-            return None
-
-        if isinstance(data.index, pd.DatetimeIndex) and data.index.tz is not None:
-            data.index = data.index.tz_convert(None)
-
-        target = datetime.datetime.combine(d, datetime.time(0, 0))
-        data_before = data[data.index <= target]
-
-        if not data_before.empty:
-            rate = float(data_before["Close"].iloc[-1])
-        else:
-            rate = float(data["Close"].iloc[0])
-
-        return price * rate
+        rate = get_fx_rate_store().rate(currency, d)
     except Exception:
         return None
 
+    if rate is None:
+        return None
+    return price * rate
 
 
-def _infer_asset_type(symbol: str, quote_type: str | None = None) -> str:
-    if quote_type:
-        qt = quote_type.lower()
-        if "crypto" in qt or qt == "cryptocurrency":
-            return "crypto"
-        if qt in ("equity", "etf", "mutualfund", "index", "fund"):
-            return "stock"
-
-    s = symbol.upper()
-    crypto_suffixes = ("-USD", "-USDT", "-EUR", "-BTC")
-    if s.endswith(crypto_suffixes):
-        return "crypto"
-    common_crypto = {"BTC", "ETH", "SOL", "XRP", "ADA", "DOGE"}
-    if s in common_crypto:
-        return "crypto"
-    return "stock"
-
 
 def _fetch_price_for_date(symbol: str, d: datetime.date) -> float | None:
     try:
         end = d + datetime.timedelta(days=1)
         start = d - datetime.timedelta(days=30)
 
-        data = yf.download(
-            symbol,
-            start=start,
-            end=end,
-            interval="1d",
-            progress=False,
-        )
+        data = get_market_data_cache().get_history(symbol, start, end, interval="1d")
 
         if data is None or data.empty:
             return None
 
-        if isinstance(data.index, pd.DatetimeIndex) and data.index.tz is not None:
-            data.index = data.index.tz_convert(None)
-
         target = datetime.datetime.combine(d, datetime.time(0, 0))
         data_before = data[data.index <= target]
 
@@ -124,16 +66,29 @@ def _fetch_price_for_date(symbol: str, d: datetime.date) -> float | None:
         return None
 
 
+def _session_cached(name: str, key, compute):
+    """
+    Ergebnis von compute() in der Session; neu berechnet wird nur bei
+    geändertem key, nicht bei jedem Rerun durch einen Widget-Klick.
+    """
+    cached = st.session_state.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    result = compute()
+    st.session_state[name] = (key, result)
+    return result
+
+
 def show_add_assets_page():
     st.title("Portfolio verwalten")
     
-    user = auth.get_logged_in_user()
+    user = get_authentication().get_logged_in_user(st.session_state)
     if not user: 
         st.warning("Bitte logge dich ein.")
         return
 
     # Manager initialisieren
-    if "manager" not in st.session_state:
+    if "manager" not in st.session_state or st.session_state.manager.userName != user["username"]:
         st.session_state.manager = PortfolioManager(user["username"])
     
     manager = st.session_state.manager
@@ -171,9 +126,86 @@ def show_add_assets_page():
     # Manager sagen, welches Portfolio aktiv ist
     manager.selectPortfolioId(selected_portfolio_id)
 
-    # Wert anzeigen
+    # Wert anzeigen (Marktwert zu aktuellen Kursen, Einstandswert als Fallback)
     if manager.currentPortfolio:
-        st.metric("Gesamtwert (EUR)", f"{manager.currentPortfolio.get_total_value():.2f} €")
+        portfolio = manager.currentPortfolio
+        # gleiche Portfolio-Revision und Kurse noch innerhalb der Quote-TTL -> gleiche Bewertung
+        quote_ttl = get_market_data_cache().quote_ttl.total_seconds()
+        valuation_key = (portfolio.id, manager.getRevision(portfolio.id), int(time.time() // quote_ttl))
+        try:
+            valuation = _session_cached("valuation", valuation_key, lambda: value_portfolio(portfolio))
+        except Exception as e:
+            st.warning(f"Aktuelle Kurse nicht verfügbar: {e}")
+            st.metric("Einstandswert (EUR)", f"{manager.currentPortfolio.get_total_value():.2f} €")
+        else:
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Marktwert (EUR)", f"{valuation.market_value:,.2f} €")
+            m2.metric("Einstandswert (EUR)", f"{valuation.cost_basis:,.2f} €")
+            m3.metric(
+                "Unrealisierter G/V",
+                f"{valuation.unrealized_pnl:,.2f} €",
+                f"{valuation.unrealized_pnl_pct:.2f} %",
+            )
+            if not valuation.holdings.empty:
+                with st.expander("Positionen zum Marktwert"):
+                    holdings = valuation.holdings.copy()
+                    holdings["weight"] = holdings["weight"] * 100
+                    st.dataframe(holdings.rename(columns={
+                        "symbol": "Symbol",
+                        "amount": "Menge",
+                        "price": "Kurs (EUR)",
+                        "cost_basis": "Einstand (EUR)",
+                        "market_value": "Marktwert (EUR)",
+                        "unrealized_pnl": "G/V (EUR)",
+                        "weight": "Gewicht (%)",
+                    }), hide_index=True)
+
+    # Wertentwicklung im Zeitraum
+    if manager.currentPortfolio and manager.currentPortfolio.assets:
+        with st.expander("Wertentwicklung"):
+            history_periods = {"1 Monat": 31, "3 Monate": 92, "6 Monate": 183, "1 Jahr": 366, "5 Jahre": 1827}
+            history_label = st.selectbox("Zeitraum", list(history_periods.keys()), index=3, key="history_period")
+            history_start = datetime.date.today() - datetime.timedelta(days=history_periods[history_label])
+            portfolio = manager.currentPortfolio
+            # Tageswerte: pro Portfolio-Revision, Zeitraum und Tag nur einmal berechnen
+            history_key = (portfolio.id, manager.getRevision(portfolio.id), history_start, datetime.date.today())
+            try:
+                history = _session_cached("value_history", history_key, lambda: value_history(portfolio, history_start))
+            except Exception as e:
+                st.error(f"Wertentwicklung konnte nicht berechnet werden: {e}")
+            else:
+                h1, h2 = st.columns(2)
+                change_pct = history["change_pct"].iloc[-1]
+                h1.metric("Gesamtkapital (EUR)", f"{history['value'].iloc[-1]:,.2f} €", None if pd.isna(change_pct) else f"{change_pct:.2f} %")
+                h2.metric("Rendite auf Einstand", f"{history['pnl'].iloc[-1]:,.2f} €", f"{history['pnl_pct'].iloc[-1]:.2f} %")
+
+                figHist = go.Figure()
+                line_trace = scatter_class(len(history))
+                value_line, invested_line = downsample(history["value"]), downsample(history["invested"])
+                figHist.add_trace(line_trace(x=value_line.index, y=value_line.values, mode="lines", name="Marktwert"))
+                figHist.add_trace(line_trace(x=invested_line.index, y=invested_line.values, mode="lines", name="Einstand"))
+                figHist.update_layout(title="Gesamtkapital", template="plotly_dark", height=400)
+                st.plotly_chart(figHist, width='stretch')
+
+    # Prognose für alle Positionen (parallel)
+    if manager.currentPortfolio and manager.currentPortfolio.assets:
+        with st.expander("Prognose für alle Positionen"):
+            if st.button("Prognosen berechnen"):
+                symbols = list(manager.currentPortfolio.symbols)
+                with st.spinner(f"Prognose für {len(symbols)} Symbole läuft..."):
+                    prognosen = prognose_batch(symbols)
+                st.dataframe([
+                    {
+                        "Symbol": symbol,
+                        "Letzter Kurs": predictions[0],
+                        f"Kursziel ({pred_days[-1]:%d.%m.%Y})": predictions[-1],
+                        "Veränderung (%)": (predictions[-1] / predictions[0] - 1) * 100,
+                    }
+                    for symbol, (_, predictions, pred_days) in sorted(prognosen.items())
+                ], hide_index=True)
+                fehlend = [s for s in symbols if s not in prognosen]
+                if fehlend:
+                    st.warning(f"Keine Prognose für: {', '.join(fehlend)}")
 
     if st.button("Portfolio löschen"):
         manager.deletePortfolio(selected_portfolio_id)
@@ -187,8 +219,8 @@ def show_add_assets_page():
 
     if query:
         try:
-            result = yf.Search(query, max_results=5)
-            options = [f"{q['symbol']} – {q.get('shortname', 'N/A')}" for q in result.quotes]
+            quotes = get_symbol_search().search(query, limit=5)
+            options = [f"{q['symbol']} – {q.get('shortname') or 'N/A'}" for q in quotes]
             if options:
                 choice = st.selectbox("Vorschläge", ["--- Bitte wählen ---"] + options)
                 if choice != "--- Bitte wählen ---":
@@ -224,7 +256,7 @@ def show_add_assets_page():
                     from portfolioasset import PortfolioAsset
                     new_asset = PortfolioAsset(
                         portfolio_id=selected_portfolio_id,
-                        asset_type=_infer_asset_type(asset_symbol_val),
+                        asset_type=infer_asset_type(asset_symbol_val, get_ticker_metadata().quote_type(asset_symbol_val)),
                         asset_symbol=asset_symbol_val,
                         asset_name=_fetch_yf_name(asset_symbol_val),
                         amount=amount_val,
@@ -239,7 +271,35 @@ def show_add_assets_page():
                 else:
                     st.error("Preis konnte nicht ermittelt werden.")
 
-# --- 5. Übersichtstabelle ---
+    # --- 5. CSV-Import ---
+    with st.expander("Transaktionen aus CSV importieren"):
+        st.caption(
+            "Spalten: symbol, amount, buy_price, bought_at (optional: asset_type, asset_name, currency). "
+            "Bei Trennzeichen ; wird 1.234,56 erwartet, bei , wird 1,234.56 erwartet, sofern nicht anders gewählt."
+        )
+        decimal_options = {"Automatisch": "auto", "1.234,56 (Komma)": ",", "1,234.56 (Punkt)": "."}
+        date_options = {"Automatisch": "auto", "TT/MM/JJJJ": "dmy", "MM/TT/JJJJ": "mdy"}
+        f1, f2 = st.columns(2)
+        decimal_label = f1.selectbox("Zahlenformat", list(decimal_options), key="import_decimal")
+        date_label = f2.selectbox("Datumsformat (bei /)", list(date_options), key="import_date_order")
+        uploaded = st.file_uploader("CSV-Datei", type=["csv", "txt"], key="asset_csv_upload")
+        if uploaded is not None and st.button("Importieren"):
+            stream = io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline="")
+            try:
+                with st.spinner("Import läuft..."):
+                    imported, errors, error_count = manager.importAssetsFromCsv(
+                        stream, decimal=decimal_options[decimal_label], date_order=date_options[date_label])
+            except ValueError as e:
+                st.error(f"Import fehlgeschlagen: {e}")
+            else:
+                st.success(f"{imported} Assets importiert.")
+                if error_count:
+                    st.warning(f"{error_count} Zeilen übersprungen:")
+                    st.dataframe([{"Zeile": line_no, "Fehler": msg} for line_no, msg in errors])
+                    if error_count > len(errors):
+                        st.caption(f"… und {error_count - len(errors)} weitere")
+
+# --- 6. Übersichtstabelle ---
     st.subheader("Aktuelle Assets")
 
     if manager.currentPortfolio and manager.currentPortfolio.assets:
@@ -262,9 +322,8 @@ def show_add_assets_page():
             cols[4].write(f"{asset.buy_price:.2f} €")
             
             # WICHTIG: asset.id nutzen zum Löschen!
-            # Falls asset.id nicht existiert, nutze den Button-Key-Trick von vorhin
-            if cols[5].button("🗑️", key=f"del_{asset.portfolio_id}"):
-                if manager.deleteAsset(asset.portfolio_id):
+            if cols[5].button("🗑️", key=f"del_{asset.id}"):
+                if manager.deleteAsset(asset.id):
                     st.rerun()
     else:
         st.info("Noch keine Assets in diesem Portfolio.")
@@ -1,11 +1,11 @@
 import streamlit as st
 from databaseHandler import DatabaseAdministration
+from resources import get_database
 
 
 def get_useradministration() -> DatabaseAdministration:
-    if "bkv" not in st.session_state:
-        st.session_state.bkv = DatabaseAdministration("user.db")
-    return st.session_state.bkv
+    # prozessweit geteilter Handler statt einer Instanz pro Session
+    return get_database()
 
 
 def show_register_page():
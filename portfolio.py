@@ -1,33 +1,79 @@
-from typing import List
-from portfolioasset import PortfolioAsset
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from portfolioasset import PortfolioAssetView
 from databaseHandler import DatabaseAdministration
 
+
+def _categorize(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """Categorical encoding: (codes, sorted categories) with categories[codes[i]] == values[i]."""
+    categories = sorted(set(values), key=lambda v: (v is None, v or ""))
+    lookup = {value: code for code, value in enumerate(categories)}
+    codes = np.fromiter((lookup[v] for v in values), dtype=np.int32, count=len(values))
+    return codes, categories
+
+
+class _AssetList:
+    """Sequence of PortfolioAssetView objects, created on access."""
+    __slots__ = ("_portfolio",)
+
+    def __init__(self, portfolio: "Portfolio"):
+        self._portfolio = portfolio
+
+    def __len__(self) -> int:
+        return len(self._portfolio.ids)
+
+    def __getitem__(self, row: int) -> PortfolioAssetView:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return PortfolioAssetView(self._portfolio, row)
+
+    def __iter__(self) -> Iterator[PortfolioAssetView]:
+        for row in range(len(self)):
+            yield PortfolioAssetView(self._portfolio, row)
+
+
 class Portfolio:
+    """
+    Lots of one portfolio, stored column-wise: NumPy arrays for ids, amounts,
+    buy prices and purchase dates, categorical codes for symbol, type and name.
+    ``assets`` gives a per-lot view for code that iterates over single assets.
+    """
+
     def __init__(self, portfolio_id: int, database_handler: DatabaseAdministration):
         self.id = portfolio_id
         self.handler = database_handler
-        self.assets: List[PortfolioAsset] = []
+        self._set_columns([], [], [], [], [], [], [])
+
+    def _set_columns(self, ids, types, symbols, names, amounts, buy_prices, bought_at):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.amounts = np.asarray(amounts, dtype=float)
+        self.buy_prices = np.asarray(buy_prices, dtype=float)
+        self.bought_at = np.asarray([str(b)[:10] for b in bought_at], dtype="datetime64[D]")
+        self.type_codes, self.types = _categorize(types)
+        self.symbol_codes, self.symbols = _categorize(symbols)
+        self.name_codes, self.names = _categorize(names)
+
+    @property
+    def assets(self) -> _AssetList:
+        return _AssetList(self)
 
     def load_assets(self):
+        # one pass over the cursor into per-column lists, no intermediate row objects
+        ids, types, symbols, names, amounts, buy_prices, bought_at = [], [], [], [], [], [], []
+        for row in self.handler.iter_asset_rows(self.id):
+            ids.append(row[0])
+            types.append(row[1])
+            symbols.append(row[2])
+            names.append(row[3])
+            amounts.append(row[4])
+            buy_prices.append(row[5])
+            bought_at.append(row[6])
 
-        raw_assets = self.handler.get_assets_for_portfolio(self.id)
-        
-        self.assets = []
-        
-        for data in raw_assets:
-            new_asset = PortfolioAsset(
-                portfolio_id=data["portfolio_id"],
-                asset_type=data["asset_type"],
-                asset_symbol=data["asset_symbol"],
-                asset_name=data["asset_name"],
-                amount=data["amount"],
-                buy_price=data["buy_price"],
-                bought_at=data["bought_at"]
-            )
-            self.assets.append(new_asset)
+        self._set_columns(ids, types, symbols, names, amounts, buy_prices, bought_at)
 
     def get_total_value(self) -> float:
-        total = 0.0
-        for asset in self.assets:
-            total = total + asset.get_total_value()
-        return total
\ No newline at end of file
+        return float(np.dot(self.amounts, self.buy_prices))
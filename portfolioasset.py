@@ -1,6 +1,8 @@
 from typing import Optional
 
 class PortfolioAsset:
+    __slots__ = ("portfolio_id", "type", "symbol", "name", "amount", "buy_price", "bought_at", "currency")
+
     def __init__(
         self,
         portfolio_id: int,
@@ -8,7 +10,7 @@ class PortfolioAsset:
         asset_symbol: str,
         asset_name: Optional[str],
         amount: float,
-        buy_price: float,          
+        buy_price: float,
         bought_at: str,
         currency: str = "EUR"
     ):
@@ -22,4 +24,55 @@ class PortfolioAsset:
         self.currency = currency
 
     def get_total_value(self) -> float:
-        return self.amount * self.buy_price
\ No newline at end of file
+        return self.amount * self.buy_price
+
+
+class PortfolioAssetView:
+    """
+    Read-only view on one lot of a loaded Portfolio. The values live in the
+    portfolio's column arrays, the view only holds the row number.
+    """
+    __slots__ = ("_portfolio", "_row")
+
+    def __init__(self, portfolio, row: int):
+        self._portfolio = portfolio
+        self._row = row
+
+    @property
+    def id(self) -> int:
+        return int(self._portfolio.ids[self._row])
+
+    @property
+    def portfolio_id(self) -> int:
+        return self._portfolio.id
+
+    @property
+    def type(self) -> str:
+        return self._portfolio.types[self._portfolio.type_codes[self._row]]
+
+    @property
+    def symbol(self) -> str:
+        return self._portfolio.symbols[self._portfolio.symbol_codes[self._row]]
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._portfolio.names[self._portfolio.name_codes[self._row]]
+
+    @property
+    def amount(self) -> float:
+        return float(self._portfolio.amounts[self._row])
+
+    @property
+    def buy_price(self) -> float:
+        return float(self._portfolio.buy_prices[self._row])
+
+    @property
+    def bought_at(self) -> str:
+        return str(self._portfolio.bought_at[self._row])
+
+    @property
+    def currency(self) -> str:
+        return "EUR"   # Kaufpreise werden immer in EUR gespeichert
+
+    def get_total_value(self) -> float:
+        return self.amount * self.buy_price
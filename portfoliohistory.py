@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from fxrates import FxRateStore
+from marketdatacache import MarketDataCache
+from resources import get_fx_rate_store, get_market_data_cache, get_ticker_metadata
+from tickermetadata import TickerMetadataStore
+from portfolio import Portfolio
+
+# extra history before the start date, so the first day has a price to carry forward
+LOOKBACK_DAYS = 10
+
+
+def _price_matrix(
+    symbols,
+    dates: np.ndarray,
+    market_data: MarketDataCache,
+    fx: FxRateStore,
+    metadata: TickerMetadataStore,
+) -> np.ndarray:
+    """dates × symbols matrix of daily closes in EUR, carried forward over non-trading days."""
+    start = dates[0].astype(object) - timedelta(days=LOOKBACK_DAYS)
+    end = dates[-1].astype(object) + timedelta(days=1)
+
+    prices = np.full((len(dates), len(symbols)), np.nan)
+    currencies = []
+    for j, symbol in enumerate(symbols):
+        hist = market_data.get_history(symbol, start, end)
+        currencies.append(metadata.currency(symbol) or "EUR")
+        if hist.empty:
+            continue
+        hist_dates = hist.index.values.astype("datetime64[D]")
+        closes = hist["Close"].to_numpy(dtype=float)
+        # as-of: last close on or before each calendar day
+        pos = np.searchsorted(hist_dates, dates, side="right") - 1
+        prices[:, j] = np.where(pos >= 0, closes[np.clip(pos, 0, None)], np.nan)
+
+    # one FX vector per distinct currency, applied column-wise
+    currencies = np.array(currencies, dtype=object)
+    for currency in set(currencies):
+        columns = currencies == currency
+        rates = fx.get_rates([currency] * len(dates), dates)
+        prices[:, columns] *= rates[:, None]
+
+    # before the first quote: use the first known price, symbols without any quote count as 0
+    prices = pd.DataFrame(prices).bfill().fillna(0.0).to_numpy()
+    return prices
+
+
+def value_history(
+    portfolio: Portfolio,
+    start: date,
+    end: Optional[date] = None,
+    market_data: Optional[MarketDataCache] = None,
+    fx: Optional[FxRateStore] = None,
+    metadata: Optional[TickerMetadataStore] = None,
+) -> pd.DataFrame:
+    """
+    Daily portfolio value in EUR between start and end (inclusive).
+
+    Builds a date × symbol price matrix and a date × symbol holdings matrix
+    (cumulative amounts from the ``bought_at`` of every lot) and reduces them
+    with one row-wise product. Columns: value, invested, pnl, pnl_pct, change_pct
+    (relative to the first day with a nonzero value, NaN before).
+    """
+    market_data = market_data or get_market_data_cache()
+    fx = fx or get_fx_rate_store()
+    metadata = metadata or get_ticker_metadata()
+    end = end or date.today()
+
+    dates = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    columns = ["value", "invested", "pnl", "pnl_pct", "change_pct"]
+    if len(dates) == 0 or len(portfolio.ids) == 0:
+        empty = pd.DataFrame(0.0, index=pd.DatetimeIndex(dates, name="Date"), columns=columns)
+        empty["change_pct"] = np.nan
+        return empty
+
+    unique_symbols, codes = portfolio.symbols, portfolio.symbol_codes
+    amounts = portfolio.amounts
+    cost = amounts * portfolio.buy_prices
+    bought_at = portfolio.bought_at
+
+    # row from which on a lot is held (lots bought before start count from day 0,
+    # lots after end land in the extra row and are dropped)
+    lot_row = np.searchsorted(dates, bought_at, side="left")
+
+    delta = np.zeros((len(dates) + 1, len(unique_symbols)))
+    np.add.at(delta, (lot_row, codes), amounts)
+    holdings = np.cumsum(delta[:-1], axis=0)
+
+    invested = np.cumsum(np.bincount(lot_row, weights=cost, minlength=len(dates) + 1)[:-1])
+
+    prices = _price_matrix(unique_symbols, dates, market_data, fx, metadata)
+    value = np.einsum("ds,ds->d", prices, holdings)
+
+    pnl = value - invested
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pnl_pct = np.where(invested > 0, pnl / invested * 100, 0.0)
+    # Veränderung ab dem ersten Tag mit Bestand; davor (und ganz ohne Wert) NaN statt -100 %
+    change_pct = np.full(len(value), np.nan)
+    held = np.flatnonzero(value != 0)
+    if len(held):
+        first = held[0]
+        change_pct[first:] = (value[first:] / value[first] - 1) * 100
+
+    return pd.DataFrame(
+        {"value": value, "invested": invested, "pnl": pnl, "pnl_pct": pnl_pct, "change_pct": change_pct},
+        index=pd.DatetimeIndex(dates, name="Date"),
+    )
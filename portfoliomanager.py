@@ -1,14 +1,28 @@
+from typing import Dict, Optional
+
 from databaseHandler import DatabaseAdministration
 from portfolioasset import PortfolioAsset
 from portfolio import Portfolio
+from assetimport import iter_asset_chunks
+from resources import get_database, get_fx_rate_store, get_symbol_search
+
+# maximal gemeldete Fehlerzeilen beim CSV-Import
+MAX_REPORTED_ERRORS = 100
 
 class PortfolioManager():
-    def __init__(self,userName):
-        self.handler = DatabaseAdministration()
+    def __init__(self, userName, handler: DatabaseAdministration = None):
+        # geteilter DB-Handler aus der Registry, falls keiner übergeben wird
+        self.handler = handler or get_database()
         self.userName = userName
         self.portfolioIds = self.handler.get_portfolio_ids(self.userName)
         self.currentPortfolio = None
 
+        # identity map: portfolio id -> geladenes Portfolio und die DB-Revision beim Laden;
+        # nur eigene Änderungen oder eine geänderte Revision lösen ein Neuladen aus
+        self._portfolios: Dict[int, Portfolio] = {}
+        self._loaded_revisions: Dict[int, Optional[int]] = {}
+        self._known_revisions: Dict[int, int] = {}
+
     def createPortfolio(self, portfolioName : str = ""):
         id = self.handler.create_portfolio(self.userName, portfolioName)
         self.portfolioIds.append(id)
@@ -18,17 +32,61 @@ class PortfolioManager():
         success = self.handler.delete_portfolio(self.userName,portfolioId)
         if not success:
             print("couldnt delete portfolio")
+            return
+
+        if portfolioId in self.portfolioIds:
+            self.portfolioIds.remove(portfolioId)
+        self._forget(portfolioId)
+        if self.currentPortfolio and self.currentPortfolio.id == portfolioId:
+            self.currentPortfolio = None
 
     def selectPortfolioId(self, id :int):
         if id in self.portfolioIds:
-            self.currentPortfolio = Portfolio(id, self.handler)
-            self.currentPortfolio.load_assets()
+            portfolio = self._portfolios.get(id)
+            if portfolio is None:
+                portfolio = Portfolio(id, self.handler)
+                self._load(portfolio, self._known_revisions.get(id))
+            self.currentPortfolio = portfolio
         else:
             print("portfolio id doesnt exist")
 
     def getPortfolios(self):
-        """Returns a list of tuples [(id, name), ...] for the user."""
-        return self.handler.get_portfolios_for_user(self.userName)
+        """
+        Returns a list of tuples [(id, name), ...] for the user.
+        The same query delivers the change counters, so cached portfolios
+        changed by someone else are dropped from the identity map here.
+        """
+        rows = self.handler.get_portfolios_with_revision(self.userName)
+
+        self._known_revisions = {portfolio_id: revision for portfolio_id, _, revision in rows}
+        self.portfolioIds = [portfolio_id for portfolio_id, _, _ in rows]
+
+        for portfolio_id in list(self._portfolios):
+            if self._loaded_revisions.get(portfolio_id) != self._known_revisions.get(portfolio_id):
+                self._forget(portfolio_id)
+                if self.currentPortfolio and self.currentPortfolio.id == portfolio_id:
+                    self.currentPortfolio = None
+
+        return [(portfolio_id, name) for portfolio_id, name, _ in rows]
+
+    def getRevision(self, portfolioId: int) -> Optional[int]:
+        """DB revision the loaded portfolio corresponds to, e.g. as cache key for derived values."""
+        return self._loaded_revisions.get(portfolioId)
+
+    def _load(self, portfolio: Portfolio, revision: Optional[int]):
+        # revision must be read before the assets: a write in between only causes one reload too many
+        portfolio.load_assets()
+        self._portfolios[portfolio.id] = portfolio
+        self._loaded_revisions[portfolio.id] = revision
+
+    def _refresh_current(self):
+        """Reloads the current portfolio after an own change."""
+        portfolio = self.currentPortfolio
+        self._load(portfolio, self.handler.get_portfolio_revision(portfolio.id))
+
+    def _forget(self, portfolio_id: int):
+        self._portfolios.pop(portfolio_id, None)
+        self._loaded_revisions.pop(portfolio_id, None)
 
     def addAssetToPortfolio(self, asset : PortfolioAsset):
         if self.currentPortfolio:
@@ -40,10 +98,76 @@ class PortfolioManager():
                                 asset.buy_price,
                                 asset.bought_at,
                                 asset.currency)
-            self.currentPortfolio.load_assets()
+            # gehaltene Symbole sind in der lokalen Suche sofort auffindbar
+            get_symbol_search().add(asset.symbol, asset.name)
+            self._refresh_current()
         else:
             print("Cant add as no valid portfolio added")
 
+    def importAssetsFromCsv(self, stream, chunk_size: int = 1000, decimal: str = "auto", date_order: str = "auto"):
+        """
+        Streams a transaction CSV into the current portfolio.
+        Every chunk is parsed, converted to EUR in one vectorized FX lookup
+        and inserted in a single transaction. Returns (imported, errors, error_count)
+        with errors as [(line_no, message), ...] (the first MAX_REPORTED_ERRORS)
+        and error_count as the number of all skipped lines.
+        If a chunk cannot be stored, its rows are retried one by one so the
+        failing lines show up in the errors.
+        """
+        if not self.currentPortfolio:
+            print("Cant import as no valid portfolio selected")
+            return 0, [], 0
+
+        fx = get_fx_rate_store()
+        imported = 0
+        errors = []
+        error_count = 0
+
+        def report(line_no, message):
+            nonlocal error_count
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append((line_no, message))
+
+        for rows, chunk_errors in iter_asset_chunks(stream, chunk_size, decimal, date_order):
+            for line_no, message in chunk_errors:
+                report(line_no, message)
+            if not rows:
+                continue
+
+            prices_eur = fx.convert_to_eur(
+                [r[4] for r in rows],   # buy_price
+                [r[6] for r in rows],   # currency
+                [r[5] for r in rows],   # bought_at
+            )
+
+            valid, line_nos = [], []
+            for row, price_eur in zip(rows, prices_eur):
+                asset_type, symbol, name, amount, _, bought_at, currency, line_no = row
+                if price_eur != price_eur:   # NaN: kein Wechselkurs
+                    report(line_no, f"kein Wechselkurs für {currency}")
+                    continue
+                valid.append((asset_type, symbol, name, amount, float(price_eur), bought_at))
+                line_nos.append(line_no)
+
+            inserted = self.handler.add_assets_bulk(self.currentPortfolio.id, valid)
+            if inserted is None:
+                # Chunk wurde zurückgerollt: zeilenweise wiederholen, um die fehlerhaften Zeilen zu finden
+                inserted = 0
+                stored = []
+                for row, line_no in zip(valid, line_nos):
+                    if self.handler.add_assets_bulk(self.currentPortfolio.id, [row]) is None:
+                        report(line_no, "konnte nicht gespeichert werden")
+                    else:
+                        inserted += 1
+                        stored.append(row)
+                valid = stored
+            imported += inserted
+            get_symbol_search().add_many({(r[1], r[2]) for r in valid})
+
+        self._refresh_current()
+        return imported, errors, error_count
+
     def deleteAsset(self, asset_id: int):
         """
         Deletes a specific asset from the database and 
@@ -53,7 +177,7 @@ class PortfolioManager():
             success = self.handler.delete_asset(asset_id)
             
             if success:
-                self.currentPortfolio.load_assets()
+                self._refresh_current()
                 return True
             else:
                 print(f"Failed to delete asset {asset_id} from database")
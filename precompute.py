@@ -0,0 +1,159 @@
+"""
+Background precomputation of forecast and news sentiment for all symbols
+held in any portfolio, so the dashboard can show a result immediately
+instead of running the whole pipeline on the button click.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from resources import get_database
+
+# Abstand zwischen zwei Läufen in Sekunden; 0 schaltet den Scheduler ab
+PRECOMPUTE_INTERVAL = float(os.getenv("PRECOMPUTE_INTERVAL", 60 * 60))
+# gleichzeitig analysierte Symbole (jede Analyse nutzt intern weitere Threads)
+PRECOMPUTE_MAX_WORKERS = int(os.getenv("PRECOMPUTE_MAX_WORKERS", 2))
+# erster Lauf erst nach dem Start, damit er nicht mit dem ersten Seitenaufbau konkurriert
+PRECOMPUTE_START_DELAY = 30
+
+
+def prognose_ergebnis(analyse) -> Optional[Dict[str, Any]]:
+    """Prognose eines prognose_analyse-Objekts als JSON-fähiges dict; None ohne Prognose."""
+    data, predictions, pred_days = analyse.get_prediction()
+    if data is None:
+        return None
+    modell, mape = analyse.get_modell_guete()
+    return {
+        "hist_dates": [ts.isoformat() for ts in data.index],
+        "hist_values": [float(v) for v in data.iloc[:, 0]],
+        "pred_days": [ts.isoformat() for ts in pred_days],
+        "predictions": [float(v) for v in predictions],
+        "modell": modell,
+        "mape": mape,
+    }
+
+
+def sentiment_ergebnis(analyse) -> Optional[Dict[str, Any]]:
+    """Empfehlung und Stichwörter als dict; None, wenn es keine News gab oder das LLM nicht geantwortet hat."""
+    from prognose_analyse import KEINE_NEWS, LLM_NICHT_ERREICHBAR
+
+    empfehlung, stichwoerter = analyse.get_sentiment()
+    if not empfehlung or empfehlung == KEINE_NEWS or LLM_NICHT_ERREICHBAR in empfehlung:
+        return None
+    return {
+        "empfehlung": empfehlung,
+        "stichwoerter": stichwoerter,
+        "konfidenz": analyse.get_konfidenz(),
+    }
+
+
+class PrecomputeScheduler:
+    """
+    Runs ``prognose_analyse.update`` periodically for the distinct symbols of
+    the assets table, at most ``max_workers`` at a time, and stores forecast
+    and sentiment with a timestamp in user.db. The price histories of all
+    symbols are loaded in one batch first. Symbols whose results are
+    younger than ``interval`` are skipped, so a restart does not redo them.
+    """
+
+    def __init__(
+        self,
+        db=None,
+        interval: float = PRECOMPUTE_INTERVAL,
+        max_workers: int = PRECOMPUTE_MAX_WORKERS,
+        analyse_factory: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.db = db or get_database()
+        self.interval = interval
+        self.max_workers = max(1, max_workers)
+        self._analyse_factory = analyse_factory
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # --------- Public API ---------
+
+    def start(self) -> None:
+        if self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="precompute", daemon=True)
+            self._thread.start()
+
+    def run_once(self) -> int:
+        """One pass over all held symbols with outdated results; returns the number stored."""
+        stand = self.db.get_precomputed_times()
+        grenze = datetime.now() - timedelta(seconds=self.interval)
+        offen = [
+            symbol for symbol, _ in self.db.get_distinct_symbols()
+            if symbol not in stand or stand[symbol] < grenze
+        ]
+        if not offen:
+            return 0
+
+        self._vorladen(offen)
+
+        gespeichert = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="precompute") as pool:
+            futures = {pool.submit(self.compute, symbol): symbol for symbol in offen}
+            for future in as_completed(futures):
+                try:
+                    gespeichert += future.result()
+                except Exception as e:
+                    print(f"Vorberechnung für {futures[future]} fehlgeschlagen: {e!r}")
+        return gespeichert
+
+    def compute(self, symbol: str) -> bool:
+        if self._stop.is_set():
+            return False
+        analyse = self._new_analyse()
+        analyse.update(symbol)
+        return self.store(symbol, analyse)
+
+    def store(self, symbol: str, analyse) -> bool:
+        """Stores the results of an analysis; failed parts keep their previous result."""
+        prognose = prognose_ergebnis(analyse)
+        sentiment = sentiment_ergebnis(analyse)
+        if prognose is not None:
+            self.db.save_precomputed_forecast(symbol, prognose)
+        if sentiment is not None:
+            self.db.save_precomputed_sentiment(symbol, sentiment)
+        return prognose is not None and sentiment is not None
+
+    def close(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            # laufende Analysen haben eigene Timeouts; der Thread ist ein Daemon
+            thread.join(timeout=5)
+
+    # --------- Internals ---------
+
+    def _new_analyse(self):
+        if self._analyse_factory is not None:
+            return self._analyse_factory()
+        from prognose_analyse import prognose_analyse
+        return prognose_analyse()
+
+    def _vorladen(self, symbols) -> None:
+        # Kurse aller offenen Symbole gebündelt in den Cache laden; die Analysen lesen danach nur noch lokal
+        from prognose_analyse import vorladen
+        try:
+            vorladen(symbols)
+        except Exception as e:
+            print(f"Vorladen der Kurse fehlgeschlagen: {e!r}")
+
+    def _run(self) -> None:
+        if self._stop.wait(PRECOMPUTE_START_DELAY):
+            return
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Vorberechnung fehlgeschlagen: {e!r}")
+            if self._stop.wait(self.interval):
+                return
@@ -1,142 +1,488 @@
-import yfinance as yf
-from statsmodels.tsa.arima.model import ARIMA
-import matplotlib.pyplot as plt
+# statsmodels, gnews und google-genai werden erst beim ersten Aufruf geladen
+# (siehe fit_arima, hole_news, llmclient.GeminiBackend), damit Login und
+# Registrierung nicht auf den Analyse-Stack warten.
 from datetime import datetime, timedelta
-from gnews import GNews
-from google import genai
 import os
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from forecasters import auto_forecast
+from resources import get_forecast_cache, get_llm_client, get_market_data_cache, get_ticker_metadata
+
+# Approximation mit Arima model
+p_arima = 6 # Anzahl letzter Ausgangswerte
+d_arima = 1 # Anzahl der Differenzbildungen, um statistisch statione Werte zu erhalten
+q_arima = 3 # Anzahl für gleitenden Mittelwert
+ARIMA_ORDER = (p_arima, d_arima, q_arima)
+
+PROGNOSE_TAGE = 14   # Vorhersagehorizont
+HISTORIE_TAGE = 90   # Kurse für den Fit bzw. den Plot
+BACKTEST_TAGE = 730  # Kurse für den Backtest der NumPy-Modelle
+
+# auto: schnelle NumPy-Modelle, Auswahl per Backtest (forecasters.py); arima: statsmodels ARIMA_ORDER
+PROGNOSE_MODELL = os.getenv("PROGNOSE_MODELL", "auto")
+# gleichzeitige Kursabfragen beim Vorladen mehrerer Ticker; gleiche Zeiträume
+# bündelt der CoalescingProvider zu einem Multi-Ticker-Download
+KURS_WORKERS = int(os.getenv("KURS_WORKERS", 8))
+
+
+def lade_schlusskurse(tickername, tage=HISTORIE_TAGE):
+    """Schlusskurse der letzten ``tage`` Tage, Spalte = Tickername (wie bei yf.download)."""
+    end_date = datetime.today()  # Aktuelles Datum -> Enddatum
+    start_date = end_date - timedelta(days=tage) # Startdatum
+    stock_data = get_market_data_cache().get_history(tickername, start_date, end_date)
+
+    # reduziere die Daten auf die Schlusskurse
+    return stock_data[['Close']].rename(columns={'Close': tickername})
+
+
+def lade_schlusskurse_alle(ticker_list, tage=HISTORIE_TAGE, max_workers=KURS_WORKERS):
+    """
+    Schlusskurse für mehrere Ticker parallel laden: {ticker: data}.
+    Ticker ohne Kurse oder mit Fehler fehlen im Ergebnis.
+    """
+    ticker_list = list(dict.fromkeys(ticker_list))
+    kurse = {}
+    if not ticker_list:
+        return kurse
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ticker_list)), thread_name_prefix="kurse") as pool:
+        futures = {pool.submit(lade_schlusskurse, t, tage): t for t in ticker_list}
+        for future in as_completed(futures):
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"Keine Kurse für {futures[future]}: {e}")
+                continue
+            if data.empty:
+                print(f"Keine Kurse für {futures[future]}")
+                continue
+            kurse[futures[future]] = data
+    # Reihenfolge wie angefragt
+    return {t: kurse[t] for t in ticker_list if t in kurse}
+
+
+def vorladen(ticker_list, modell=PROGNOSE_MODELL):
+    """Lädt die Kurse, die die Prognose mit ``modell`` braucht, für alle Ticker in den Cache."""
+    return lade_schlusskurse_alle(ticker_list, HISTORIE_TAGE if modell == "arima" else BACKTEST_TAGE)
+
+
+def _cache_schluessel(data):
+    # (Zeitstempel, Schlusskurs) des letzten Kurses; der heutige Kurs ändert sich noch während des Handels
+    return data.index[-1].isoformat(), float(data.iloc[-1, 0])
+
+
+def _prognose_ergebnis(data, predictions):
+    # Füge den letzten Wert des historischen Kurses zur Vorhersage hinzu, um die beiden linien im Plot zu verbinden
+    predictions = [data.iloc[-1].values[0].tolist()] + list(predictions)
+    # Zeitvektor für die Vorsage (x-Achse des plots)
+    pred_days = [data.index[-1] + timedelta(days=i) for i in range(0, PROGNOSE_TAGE + 1)]
+    return data, predictions, pred_days
+
+
+def prognose_auto(tickername, forecast_cache, historie=None):
+    """
+    Prognose mit dem Modell, das im Rolling-Origin-Backtest über die letzten
+    BACKTEST_TAGE am besten abschneidet. Liefert (Plot-Daten, Cache-Eintrag
+    mit 'forecast', 'model' und 'mape'); ohne neuen Kurs direkt aus dem Cache.
+    ``historie`` sind bereits geladene Kurse (siehe vorladen).
+    """
+    if historie is None:
+        historie = lade_schlusskurse(tickername, BACKTEST_TAGE)
+    data = historie[historie.index >= historie.index[-1] - timedelta(days=HISTORIE_TAGE)]
+    last_ts, last_close = _cache_schluessel(data)
+
+    eintrag = forecast_cache.get_entry(tickername, "auto", last_ts, last_close)
+    if eintrag is None:
+        modell, predictions, mape, _ = auto_forecast(historie[tickername].to_numpy(), PROGNOSE_TAGE)
+        forecast_cache.put(tickername, "auto", last_ts, last_close, [], predictions, modell, mape)
+        eintrag = {"forecast": predictions, "model": modell, "mape": mape}
+    return data, eintrag
+
+
+def fit_arima(data, order, steps=14, start_params=None):
+    """
+    Fittet ein ARIMA-Modell und liefert (Parameter, Vorhersage für ``steps`` Tage).
+    Mit ``start_params`` (z.B. vom letzten Fit) startet die Optimierung dort.
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+
+    model = ARIMA(data, order=order)
+    if start_params is not None and len(start_params) == len(model.param_names):
+        model_fit = model.fit(start_params=start_params)
+    else:
+        model_fit = model.fit()
+
+    predictions = [float(v) for v in model_fit.forecast(steps=steps)]
+    return [float(p) for p in model_fit.params], predictions
+
+
+LLM_MODELL = "gemini-2.5-flash"
+LLM_NICHT_ERREICHBAR = 'Google Gemini derzeit nicht erreichbar'
+KEINE_NEWS = 'Keine aktuellen News gefunden'
+
+# maximale Dauer je Stufe von update() in Sekunden
+STUFEN_TIMEOUT = {
+    "firma": 10,      # Ticker-Metadaten
+    "news": 15,       # GNews
+    "llm": 30,        # Gemini
+    "prognose": 60,   # Kurse laden + Modell-Fit
+}
+
+
+def _stufen_ergebnis(future, stufe, default, frist=None):
+    # frist: gemeinsames Ende (time.monotonic()) für mehrere Abfragen einer Stufe
+    timeout = STUFEN_TIMEOUT[stufe] if frist is None else max(frist - time.monotonic(), 0)
+    try:
+        return future.result(timeout=timeout)
+    except Exception as e:
+        print(f"Stufe '{stufe}' fehlgeschlagen oder Timeout: {e!r}")
+        return default
+
+
+def hole_news(FirmenName):
+    """Nachrichten zum Firmennamen und die Meldungen als Prompt-Liste."""
+    if not isinstance(FirmenName, str):
+        assert "wrong type for input: FirmenName"
+
+    from gnews import GNews
+
+    # initialisiere news scraper
+    gnews = GNews()
+    # hole Nachrichten
+    news = gnews.get_news(FirmenName)
+    # reduziere news auf die reinen Meldungen (Key: 'description')
+    news_prompt = ""
+    for i in range(len(news)):
+        news_prompt += f"- {news[i]['description']}\n"
+
+    return news, news_prompt
+
+
+def _mit_pfeil(empfehlung):
+    # Ergänzung um Pfeilsymbol
+    if empfehlung == 'Verkaufen':
+        arrow = '⬇️'
+    elif empfehlung == 'Halten':
+        arrow = '➡️'
+    elif empfehlung == 'Kaufen':
+        arrow = '⬆️'
+    else:
+        arrow = ' '            
+
+    return empfehlung + ' ' + arrow
+
+
+EMPFEHLUNGEN = ('Kaufen', 'Halten', 'Verkaufen')
+
+# JSON-Schema für die strukturierte Antwort (eine Abfrage statt zwei)
+SENTIMENT_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "empfehlung": {"type": "STRING", "enum": list(EMPFEHLUNGEN)},
+        "stichwoerter": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "konfidenz": {"type": "NUMBER"},
+    },
+    "required": ["empfehlung", "stichwoerter", "konfidenz"],
+}
+
+
+def parse_sentiment(text):
+    """
+    Prüft die JSON-Antwort der strukturierten Abfrage.
+    Liefert (empfehlung, stichwoerter, konfidenz) oder wirft ValueError.
+    """
+    try:
+        daten = json.loads(text)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"keine gültige JSON-Antwort: {e}")
+    if not isinstance(daten, dict):
+        raise ValueError("JSON-Objekt erwartet")
+
+    empfehlung = str(daten.get('empfehlung', '')).strip().capitalize()
+    if empfehlung not in EMPFEHLUNGEN:
+        raise ValueError(f"unbekannte Empfehlung: {empfehlung!r}")
+
+    stichwoerter = daten.get('stichwoerter')
+    if not isinstance(stichwoerter, list) or not all(isinstance(w, str) for w in stichwoerter):
+        raise ValueError("stichwoerter muss eine Liste von Strings sein")
+    stichwoerter = [w.strip() for w in stichwoerter if w.strip()][:10]
+
+    try:
+        konfidenz = float(daten.get('konfidenz'))
+    except (TypeError, ValueError):
+        raise ValueError("konfidenz fehlt oder ist keine Zahl")
+    if not 0.0 <= konfidenz <= 1.0:
+        raise ValueError(f"konfidenz außerhalb von [0, 1]: {konfidenz}")
+
+    return empfehlung, stichwoerter, konfidenz
+
+
+def llm_sentiment_strukturiert(client, news_prompt):
+    """
+    Empfehlung, 10 Stichwörter und Konfidenz in einer einzigen LLM-Abfrage.
+    Liefert (empfehlung mit Pfeil, stichwoerter als Text, konfidenz); wirft bei Fehlern.
+    """
+    prompt = "Du bist ein erfahrener Profi am Finanzmarkt. Du hast ein feines Gespür für neue Nachrichten und wie diese sich auf die Kursverläufe von Aktien auswirken. Erstelle aus den folgenden Nachrichten eine Empfehlung (Kaufen, Halten oder Verkaufen), die 10 wichtigsten Stichwörter mit dem massgeblichen Einfluss auf den Aktienkurs der letzten 48 Stunden und deine Konfidenz zwischen 0 und 1. Benutze keine anderen Quellen als diesen Prompt. News:"
+    prompt = f"{prompt} {news_prompt}"
+
+    config = {"response_mime_type": "application/json", "response_schema": SENTIMENT_SCHEMA}
+    antwort = client.generate(LLM_MODELL, prompt, config, validate=parse_sentiment)
+    empfehlung, stichwoerter, konfidenz = parse_sentiment(antwort)
+
+    return _mit_pfeil(empfehlung), ', '.join(stichwoerter), konfidenz
+
+
+def llm_empfehlung(client, news_prompt):
+    """client: CachedLLMClient (resources.get_llm_client() oder mit StubBackend für Tests)"""
+    # Prompt-Erstellung
+    prompt = "Du bist ein erfahrener Profi am Finanzmarkt. Du hast ein feines Gespür für neue Nachrichten und wie diese sich auf die Kursverläufe von Aktien auswirken. Aus einer Reihe von Nachrichten erstellst du eine Empfehlung. Antworte nur mit Verkaufen, Halten oder Kaufen. Beziehe dich auf folgende News:"
+    prompt = f"{prompt} {news_prompt}"
+
+    try:
+        # LLM Abfrage für Handlungsempfehlung (gleiche News -> Antwort aus dem Cache)
+        empfehlung = client.generate(LLM_MODELL, prompt).strip()
+    except Exception as e:
+        print(f"LLM-Abfrage fehlgeschlagen: {e!r}")
+        empfehlung = LLM_NICHT_ERREICHBAR
+
+    return _mit_pfeil(empfehlung)
+
+
+def llm_stichwoerter(client, news_prompt):
+    # prompt um news zu kondensieren
+    prompt = "Reduziere folgende News auf die 10 wichtigsten Stichwörter. Wähle diese so, dass sie den massgeblichen Einfluss auf den Aktienkurs der letzten 48 stunden hatten. Gebe nichts anderes, als diese 10 wörter zurück. Benutze keine anderen Quellen als diesen Prompt. News:"
+    prompt = f"{prompt} {news_prompt}"
+
+    try:
+        # LLM Abfrage um news zu kondensieren
+        news_reduktion = client.generate(LLM_MODELL, prompt).strip()
+    except Exception as e:
+        print(f"LLM-Abfrage fehlgeschlagen: {e!r}")
+        news_reduktion = LLM_NICHT_ERREICHBAR
+
+    return news_reduktion
+
+
+def prognose_batch(ticker_list, max_workers=None, modell=PROGNOSE_MODELL):
+    """
+    Prognose für mehrere Ticker auf einmal, z.B. alle Symbole eines Portfolios.
+    Die Kurse werden vorab parallel geladen (vorladen).
+    Die NumPy-Modelle brauchen Millisekunden und laufen direkt; ARIMA-Fits ohne
+    Cache-Treffer laufen parallel in einem Prozesspool (ein Prozess pro Kern).
+    Rückgabe: {ticker: (hist_data, predictions, pred_days)} wie get_prediction();
+    Ticker ohne Kursdaten oder mit Fehler fehlen.
+    """
+    forecast_cache = get_forecast_cache()
+    ergebnisse = {}
+    # alle Kurse vorab parallel laden statt je Ticker nacheinander
+    kurse = vorladen(ticker_list, modell)
+
+    if modell != "arima":
+        for tickername, historie in kurse.items():
+            try:
+                data, eintrag = prognose_auto(tickername, forecast_cache, historie)
+            except Exception as e:
+                print(f"Prognose für {tickername} fehlgeschlagen: {e}")
+                continue
+            ergebnisse[tickername] = _prognose_ergebnis(data, eintrag["forecast"])
+        return ergebnisse
+
+    offene_fits = {}   # ticker -> (data, (last_ts, last_close), start_params)
+
+    for tickername, data in kurse.items():
+        if len(data) <= sum(ARIMA_ORDER):
+            print(f"Zu wenige Kurse für {tickername}")
+            continue
+
+        schluessel = _cache_schluessel(data)
+        predictions = forecast_cache.get(tickername, ARIMA_ORDER, *schluessel)
+        if predictions is not None:
+            ergebnisse[tickername] = _prognose_ergebnis(data, predictions)
+        else:
+            offene_fits[tickername] = (data, schluessel, forecast_cache.latest_params(tickername, ARIMA_ORDER))
+
+    def _speichern(tickername, params, predictions):
+        data, schluessel, _ = offene_fits[tickername]
+        forecast_cache.put(tickername, ARIMA_ORDER, *schluessel, params, predictions)
+        ergebnisse[tickername] = _prognose_ergebnis(data, predictions)
+
+    if len(offene_fits) == 1:
+        # ein einzelner Fit lohnt keinen Prozessstart
+        (tickername, (data, _, start_params)), = offene_fits.items()
+        try:
+            _speichern(tickername, *fit_arima(data, ARIMA_ORDER, PROGNOSE_TAGE, start_params))
+        except Exception as e:
+            print(f"Prognose für {tickername} fehlgeschlagen: {e}")
+    elif offene_fits:
+        # spawn statt fork: der Streamlit-Prozess ist multithreaded
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=ctx) as pool:
+            futures = {
+                pool.submit(fit_arima, data, ARIMA_ORDER, PROGNOSE_TAGE, start_params): tickername
+                for tickername, (data, _, start_params) in offene_fits.items()
+            }
+            for future in as_completed(futures):
+                tickername = futures[future]
+                try:
+                    _speichern(tickername, *future.result())
+                except Exception as e:
+                    print(f"Prognose für {tickername} fehlgeschlagen: {e}")
+
+    return ergebnisse
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 class prognose_analyse:
      
-    def __init__(self):
+    def __init__(self, llm_client=None, strukturiert=True, modell=PROGNOSE_MODELL):
         self.Firmenname = ''
+        # austauschbar, z.B. CachedLLMClient(StubBackend(...)) für Tests
+        self.llm_client = llm_client or get_llm_client()
+        # eine strukturierte LLM-Abfrage statt zwei Freitext-Abfragen
+        self.strukturiert = strukturiert
+        # 'auto' (NumPy-Modelle mit Backtest) oder 'arima'
+        self.modell = modell
 
         pred_dict = {}
         pred_dict['hist_data'] = None
         pred_dict['pred'] = {}
         pred_dict['pred']['Tage'] = []
         pred_dict['pred']['Werte'] = []
+        pred_dict['modell'] = None
+        pred_dict['mape'] = None
         self.pred_dict = pred_dict
 
         sent_dict = {}
         sent_dict['news'] = ''
         sent_dict['news_red'] = ''
         sent_dict['empfehlung'] = ''
+        sent_dict['konfidenz'] = None
         self.sent_dict = sent_dict
         
 
     def ticker2Firma(self, tickername):
-        # Tickername -> Firmenname
-        FirmenName = yf.Ticker(tickername).info.get('longName')
+        # Tickername -> Firmenname (aus dem gemeinsamen Metadaten-Speicher)
+        FirmenName = get_ticker_metadata().long_name(tickername)
         self.FirmenName = FirmenName
 
         return FirmenName
 
 
-    def prognose_kurs(self, tickername):
-
-        # lade Kurse der letzten 90 Tage
-        end_date = datetime.today()  # Aktuelles Datum -> Enddatum
-        start_date = end_date - timedelta(days=90) # Startdatum
-        stock_data = yf.download(tickername, start=start_date.strftime('%Y-%m-%d'), end=end_date.strftime('%Y-%m-%d'),  auto_adjust=True, progress=False)
-
-        # reduziere die Daten auf die Schlusskurse
-        data = stock_data['Close']
-
-        # Approximation mit Arima model
-        p_arima = 6 # Anzahl letzter Ausgangswerte
-        d_arima = 1 # Anzahl der Differenzbildungen, um statistisch statione Werte zu erhalten
-        q_arima = 3 # Anzahl für gleitenden Mittelwert
-        model = ARIMA(data, order=(p_arima, d_arima, q_arima))
-        model_fit = model.fit()
-
-        # korrektur des Anfangswertes
-        #model_fit.fittedvalues.loc[model_fit.fittedvalues.index[0]] = data.iloc[0]
-        #model_fit_fitted = model_fit.fittedvalues.copy()  # nötig um fehlermeldungen zu unterdrücken
-        #model_fit_fitted.loc[model_fit_fitted.index[0]] = data.iloc[0]
-
-        # vorhersage für die nächsten 14 Tage
-        predictions = model_fit.forecast(steps=14)
-        # Füge den letzten Wert des historischen Kurses zur Vorhersage hinzu, um die beiden linien im Plot zu verbinden
-        predictions = [data.iloc[-1].values[0].tolist()] + list(predictions)
-        # Zeitvektor für die Vorsage (x-Achse des plots)
-        pred_days = [data.index[-1] + timedelta(days=i) for i in range(0, 15)]
+    def _berechne_prognose(self, tickername):
+        """
+        (hist_data, predictions, pred_days, modell, mape) ohne Seiteneffekte auf
+        self, damit ein abgebrochener Worker-Thread kein späteres Ergebnis überschreibt.
+        """
+        forecast_cache = get_forecast_cache()
 
+        if self.modell != "arima":
+            data, eintrag = prognose_auto(tickername, forecast_cache)
+            predictions = eintrag["forecast"]
+            modell, mape = eintrag["model"], eintrag["mape"]
+        else:
+            data = lade_schlusskurse(tickername)
+
+            # vorhersage für die nächsten 14 Tage; ohne neuen Kurs seit dem letzten Fit direkt aus dem Cache
+            last_ts, last_close = _cache_schluessel(data)
+            predictions = forecast_cache.get(tickername, ARIMA_ORDER, last_ts, last_close)
+            if predictions is None:
+                # Warmstart mit den Parametern des letzten Fits
+                start_params = forecast_cache.latest_params(tickername, ARIMA_ORDER)
+                params, predictions = fit_arima(data, ARIMA_ORDER, steps=PROGNOSE_TAGE, start_params=start_params)
+                forecast_cache.put(tickername, ARIMA_ORDER, last_ts, last_close, params, predictions)
+            modell, mape = "arima", None
+
+        data, predictions, pred_days = _prognose_ergebnis(data, predictions)
+        return data, predictions, pred_days, modell, mape
+
+    def _setze_prognose(self, data=None, predictions=(), pred_days=(), modell=None, mape=None):
+        # ohne Argumente: Prognose zurücksetzen (z.B. nach Fehler oder Timeout)
         self.pred_dict['hist_data'] = data
-        self.pred_dict['pred']['Tage'] = predictions
-        self.pred_dict['pred']['Werte'] = pred_days
+        self.pred_dict['pred']['Tage'] = list(predictions)
+        self.pred_dict['pred']['Werte'] = list(pred_days)
+        self.pred_dict['modell'] = modell
+        self.pred_dict['mape'] = mape
+
+    def prognose_kurs(self, tickername):
+        self._setze_prognose(*self._berechne_prognose(tickername))
    
 
     def news_sentiment(self, tickername):
 
         FirmenName = self.ticker2Firma(tickername)
+        news, news_prompt = hole_news(FirmenName) if FirmenName else ([], "")
 
-        if not isinstance(FirmenName, str):
-            assert "wrong type for input: FirmenName"
-
-        # initialisiere news scraper
-        gnews = GNews()
-        # hole Nachrichten
-        news = gnews.get_news(FirmenName)
-        # reduziere news auf die reinen Meldungen (Key: 'description')
-        news_prompt = ""
-        for i in range(len(news)):
-            news_prompt += f"- {news[i]['description']}\n"
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="prognose_analyse") as pool:
+            empfehlung, news_reduktion, konfidenz = self._llm_auswertung(news_prompt, pool)
 
-        # initialisiere LLM
-        client = genai.Client(api_key=GEMINI_API_KEY)
-
-        # Prompt-Erstellung
-        prompt = "Du bist ein erfahrener Profi am Finanzmarkt. Du hast ein feines Gespür für neue Nachrichten und wie diese sich auf die Kursverläufe von Aktien auswirken. Aus einer Reihe von Nachrichten erstellst du eine Empfehlung. Antworte nur mit Verkaufen, Halten oder Kaufen. Beziehe dich auf folgende News:"
-        prompt = f"{prompt} {news_prompt}"
+        # update class attributes
+        self.sent_dict['news'] = news
+        self.sent_dict['news_red'] = news_reduktion
+        self.sent_dict['empfehlung'] = empfehlung
+        self.sent_dict['konfidenz'] = konfidenz
+
+    def _llm_auswertung(self, news_prompt, pool):
+        """
+        (empfehlung, news_reduktion, konfidenz); strukturiert mit Fallback auf zwei
+        Freitext-Abfragen. Alle Abfragen zusammen haben ein STUFEN_TIMEOUT["llm"];
+        ohne News wird das LLM gar nicht gefragt.
+        """
+        if not news_prompt:
+            return KEINE_NEWS, '', None
+
+        frist = time.monotonic() + STUFEN_TIMEOUT["llm"]
+        if self.strukturiert:
+            ergebnis = _stufen_ergebnis(
+                pool.submit(llm_sentiment_strukturiert, self.llm_client, news_prompt), "llm", None, frist)
+            if ergebnis is not None:
+                return ergebnis
+            if time.monotonic() >= frist:
+                return LLM_NICHT_ERREICHBAR, LLM_NICHT_ERREICHBAR, None
+
+        # beide Freitext-Abfragen sind unabhängig voneinander
+        f_empfehlung = pool.submit(llm_empfehlung, self.llm_client, news_prompt)
+        f_stichwoerter = pool.submit(llm_stichwoerter, self.llm_client, news_prompt)
+        empfehlung = _stufen_ergebnis(f_empfehlung, "llm", LLM_NICHT_ERREICHBAR, frist)
+        news_reduktion = _stufen_ergebnis(f_stichwoerter, "llm", LLM_NICHT_ERREICHBAR, frist)
+        return empfehlung, news_reduktion, None
 
+    def update(self, tickername):
+        """
+        Führt Prognose und Sentiment-Analyse nebenläufig aus:
+        Firmenname -> News -> LLM-Auswertung läuft parallel zur Prognose.
+        Jede Stufe hat ein eigenes Timeout (STUFEN_TIMEOUT); bei Überschreitung
+        wird ein Platzhalter angezeigt statt zu warten.
+        """
+        pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prognose_analyse")
         try:
-            # LLM Abfrage für Handlungsempfehlung
-            response = client.models.generate_content(
-            model="gemini-2.5-flash", contents = prompt
-            )
-            if response.status_code == 200:
-                empfehlung = response.text
-        except:
-            empfehlung = 'Google Gemini derzeit nicht erreichbar'
-
-        # Ergänzung um Pfeilsymbol
-        if empfehlung == 'Verkaufen':
-            arrow = '⬇️'
-        elif empfehlung == 'Halten':
-            arrow = '➡️'
-        elif empfehlung == 'Kaufen':
-            arrow = '⬆️'
-        else:
-            arrow = ' '            
+            # Worker liefern nur Werte zurück; self wird ausschließlich hier im aufrufenden Thread gesetzt
+            f_prognose = pool.submit(self._berechne_prognose, tickername)
+            start_prognose = time.monotonic()
 
-        empfehlung = empfehlung + ' ' + arrow
+            FirmenName = _stufen_ergebnis(pool.submit(get_ticker_metadata().long_name, tickername), "firma", None)
+            self.FirmenName = FirmenName
 
-        # prompt um news zu kondensieren
-        prompt = "Reduziere folgende News auf die 10 wichtigsten Stichwörter. Wähle diese so, dass sie den massgeblichen Einfluss auf den Aktienkurs der letzten 48 stunden hatten. Gebe nichts anderes, als diese 10 wörter zurück. Benutze keine anderen Quellen als diesen Prompt. News:"
-        prompt = f"{prompt} {news_prompt}"
+            news, news_prompt = [], ""
+            if FirmenName:
+                news, news_prompt = _stufen_ergebnis(pool.submit(hole_news, FirmenName), "news", ([], ""))
 
-        try:
-            # LLM Abfrage um news zu kondensieren
-            response = client.models.generate_content(
-            model="gemini-2.5-flash", contents = prompt
-            )
-            if response.status_code == 200:
-                news_reduktion = response.text
-        except:
-            news_reduktion = 'Google Gemini derzeit nicht erreichbar'
-        
+            empfehlung, news_reduktion, konfidenz = self._llm_auswertung(news_prompt, pool)
 
-        # update class attributes
-        self.sent_dict['news'] = news
-        self.sent_dict['news_red'] = news_reduktion
-        self.sent_dict['empfehlung'] = empfehlung
+            self.sent_dict['news'] = news
+            self.sent_dict['news_red'] = news_reduktion
+            self.sent_dict['empfehlung'] = empfehlung
+            self.sent_dict['konfidenz'] = konfidenz
 
-    def update(self, tickername):
-        self.news_sentiment(tickername)
-        self.prognose_kurs(tickername)
+            # Restzeit der Prognose-Stufe, sie läuft seit Beginn mit
+            restzeit = max(STUFEN_TIMEOUT["prognose"] - (time.monotonic() - start_prognose), 0)
+            try:
+                self._setze_prognose(*f_prognose.result(timeout=restzeit))
+            except Exception as e:
+                print(f"Prognose für {tickername} fehlgeschlagen: {e!r}")
+                self._setze_prognose()
+        finally:
+            # nicht auf hängende Stufen warten
+            pool.shutdown(wait=False, cancel_futures=True)
 
 
     def get_sentiment(self):
@@ -145,6 +491,14 @@ class prognose_analyse:
 
         return empfehlung, news_reduktion
 
+    def get_konfidenz(self):
+        # None, wenn die Empfehlung aus dem Freitext-Fallback stammt
+        return self.sent_dict['konfidenz']
+
+    def get_modell_guete(self):
+        # (Modellname, MAPE in % aus dem Backtest oder None)
+        return self.pred_dict['modell'], self.pred_dict['mape']
+
     def get_prediction(self):
 
         pred_data = self.pred_dict['hist_data']
@@ -0,0 +1,197 @@
+"""
+Central registry for the process-wide shared resources.
+
+Every resource (database handler, market data cache, ticker metadata, FX
+store, forecast cache, LLM client, precompute scheduler, ...) is created
+once on first use and then shared by all Streamlit sessions and reruns, the background jobs and the benchmarks.
+All of them are thread-safe. ``shutdown()`` releases them in reverse
+creation order and runs at interpreter exit; ``override()`` swaps in a
+replacement, e.g. a fake market data provider for tests.
+
+Deliberately independent of Streamlit (instead of st.cache_resource), so
+the same instances are used outside of a Streamlit script run.
+"""
+import atexit
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+class ResourceRegistry:
+    def __init__(self) -> None:
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._closers: Dict[str, Optional[Callable[[Any], None]]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._order: List[str] = []
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any], close: Optional[Callable[[Any], None]] = None) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._closers[name] = close
+
+    def get(self, name: str) -> Any:
+        # fast path without lock once the instance exists
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = self._factories[name]()
+                self._order.append(name)
+            return self._instances[name]
+
+    def override(self, name: str, instance: Any) -> None:
+        """Replaces (or pre-sets) a resource without calling its factory."""
+        with self._lock:
+            self.release(name)
+            self._instances[name] = instance
+            self._order.append(name)
+
+    def release(self, name: str) -> None:
+        with self._lock:
+            instance = self._instances.pop(name, None)
+            if name in self._order:
+                self._order.remove(name)
+            close = self._closers.get(name)
+            if instance is not None and close is not None:
+                try:
+                    close(instance)
+                except Exception as e:
+                    print(f"Closing resource '{name}' failed: {e}")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for name in reversed(list(self._order)):
+                self.release(name)
+
+
+registry = ResourceRegistry()
+
+
+# --------- Factories ---------
+
+def _create_database():
+    from databaseHandler import DatabaseAdministration
+    return DatabaseAdministration("user.db")
+
+
+def _create_authentication():
+    from authentication import Authentication
+    return Authentication(get_database())
+
+
+def _create_market_data_provider():
+    from marketdataprovider import create_provider
+    return create_provider()
+
+
+def _create_market_data_cache():
+    from marketdatacache import MarketDataCache
+    return MarketDataCache()
+
+
+def _create_ticker_metadata():
+    from tickermetadata import TickerMetadataStore
+    return TickerMetadataStore()
+
+
+def _create_symbol_search():
+    from symbolsearch import SymbolSearchIndex
+    index = SymbolSearchIndex()
+    index.add_many(get_database().get_distinct_symbols())   # held symbols
+    return index
+
+
+def _create_fx_rate_store():
+    from fxrates import FxRateStore
+    return FxRateStore(get_market_data_cache())
+
+
+def _create_chart_cache():
+    from chartdata import ChartSeriesCache
+    return ChartSeriesCache()
+
+
+def _create_forecast_cache():
+    from forecastcache import ForecastCache
+    return ForecastCache()
+
+
+def _create_llm_client():
+    from llmclient import CachedLLMClient, GeminiBackend, LLMResponseCache
+    return CachedLLMClient(GeminiBackend(), LLMResponseCache())
+
+
+def _create_precompute_scheduler():
+    from precompute import PrecomputeScheduler
+    scheduler = PrecomputeScheduler(get_database())
+    scheduler.start()
+    return scheduler
+
+
+def _close_connections(_):
+    # all SQLite-backed resources share the pooled connections
+    from databaseHandler import connection_pool
+    connection_pool.close_all()
+
+
+registry.register("database", _create_database, close=_close_connections)
+registry.register("authentication", _create_authentication)
+registry.register("market_data_provider", _create_market_data_provider)
+registry.register("market_data", _create_market_data_cache)
+registry.register("ticker_metadata", _create_ticker_metadata, close=lambda store: store.close())
+registry.register("symbol_search", _create_symbol_search)
+registry.register("fx_rates", _create_fx_rate_store)
+registry.register("chart_cache", _create_chart_cache)
+registry.register("forecast_cache", _create_forecast_cache)
+registry.register("llm_client", _create_llm_client)
+registry.register("precompute", _create_precompute_scheduler, close=lambda scheduler: scheduler.close())
+
+atexit.register(registry.shutdown)
+
+
+# --------- Accessors ---------
+
+def get_database():
+    return registry.get("database")
+
+
+def get_authentication():
+    return registry.get("authentication")
+
+
+def get_market_data_provider():
+    return registry.get("market_data_provider")
+
+
+def get_market_data_cache():
+    return registry.get("market_data")
+
+
+def get_ticker_metadata():
+    return registry.get("ticker_metadata")
+
+
+def get_symbol_search():
+    return registry.get("symbol_search")
+
+
+def get_fx_rate_store():
+    return registry.get("fx_rates")
+
+
+def get_chart_cache():
+    return registry.get("chart_cache")
+
+
+def get_forecast_cache():
+    return registry.get("forecast_cache")
+
+
+def get_llm_client():
+    return registry.get("llm_client")
+
+
+def get_precompute_scheduler():
+    return registry.get("precompute")
@@ -0,0 +1,277 @@
+import bisect
+import csv
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from databaseHandler import connection_pool, run_migrations
+from marketdataprovider import MarketDataProvider
+from resources import get_market_data_provider
+
+# optional bundled symbol list (CSV with the columns symbol, name[, exchange, quote_type])
+SYMBOL_LIST_PATH = os.getenv("SYMBOL_LIST_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "symbols.csv"))
+
+# minimal share of the query trigrams an entry must contain to count as a fuzzy hit
+FUZZY_MIN_SCORE = 0.5
+# a fuzzy hit this close counts as a local answer, no remote search
+FUZZY_HIT_SCORE = 0.75
+# upper bound for prefix candidates, keeps one-letter queries fast on large lists
+MAX_PREFIX_CANDIDATES = 200
+
+MIGRATIONS = [
+    (1, [
+        # every symbol ever returned by yf.Search
+        """
+        CREATE TABLE IF NOT EXISTS search_symbols (
+            symbol TEXT PRIMARY KEY,
+            name TEXT,
+            exchange TEXT,
+            quote_type TEXT,
+            added_at TIMESTAMP NOT NULL
+        );
+        """,
+    ]),
+]
+
+# match tiers, lower is better
+EXACT, SYMBOL_PREFIX, NAME_PREFIX, WORD_PREFIX, FUZZY = range(5)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().replace("-", " ").replace(".", " ").split())
+
+
+def _trigrams(word: str) -> Set[str]:
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymbolSearchIndex:
+    """
+    Local autocomplete over known symbols.
+
+    Known symbols are earlier yf.Search results (persisted), symbols held in
+    any portfolio and the optional bundled list. Lookups run against a sorted
+    key list (prefix search via bisect) and a trigram index (typos, partial
+    names) and take microseconds. Only a query without a local hit goes to
+    yf.Search; its results are added to the index.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "symbolsearch.db",
+        symbol_list_path: Optional[str] = SYMBOL_LIST_PATH,
+        provider: Optional[MarketDataProvider] = None,
+    ) -> None:
+        self.db_path = db_path
+        self._provider = provider
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Optional[str]]] = {}
+        self._keys: List[Tuple[str, str, int]] = []        # (key, symbol, tier) sorted by key
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._remote_queries: Set[str] = set()
+        run_migrations(self.db_path, MIGRATIONS)
+
+        self._load_persisted()
+        if symbol_list_path and os.path.exists(symbol_list_path):
+            self._load_symbol_list(symbol_list_path)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        return connection_pool.get(self.db_path)
+
+    # --------- Public API ---------
+
+    def add(self, symbol: str, name: Optional[str] = None, exchange: Optional[str] = None, quote_type: Optional[str] = None) -> None:
+        """Adds a symbol to the in-memory index (not persisted)."""
+        with self._lock:
+            self._add(self._insert_key, symbol, name, exchange, quote_type)
+
+    def add_many(self, symbols: Iterable[Sequence[Optional[str]]]) -> None:
+        """
+        Adds (symbol, name[, exchange[, quote_type]]) rows. The new keys are
+        collected and merged into the key list with one sort instead of one
+        list insert per key.
+        """
+        with self._lock:
+            keys: List[Tuple[str, str, int]] = []
+            for row in symbols:
+                self._add(keys.append, *row)
+            if keys:
+                self._keys = sorted(set(self._keys).union(keys))
+
+    def search_local(self, query: str, limit: int = 10) -> List[Dict[str, Optional[str]]]:
+        """Ranked local hits: exact symbol, symbol prefix, name prefix, word prefix, fuzzy."""
+        with self._lock:
+            return [dict(self._entries[symbol]) for symbol, _, _ in self._rank(query, limit)]
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Optional[str]]]:
+        """
+        Autocomplete in the format of ``yf.Search(...).quotes``.
+        Falls back to yf.Search only on a miss (no prefix hit and no close
+        fuzzy hit) and at most once per query and process; a failed request
+        does not count.
+        """
+        key = _normalize(query)
+        if not key:
+            return []
+
+        with self._lock:
+            ranked = self._rank(query, limit)
+            hit = any(tier < FUZZY or -score >= FUZZY_HIT_SCORE for _, tier, score in ranked)
+            if hit or key in self._remote_queries:
+                return [dict(self._entries[symbol]) for symbol, _, _ in ranked]
+
+        quotes = self._remote_search(query, limit)
+        if quotes is None:
+            # failed request is not remembered, the next search tries again
+            return [dict(self._entries[symbol]) for symbol, _, _ in ranked]
+        with self._lock:
+            self._remote_queries.add(key)
+        self._persist(quotes)
+        for quote in quotes:
+            self.add(quote["symbol"], quote.get("shortname"), quote.get("exchange"), quote.get("quoteType"))
+        return self.search_local(query, limit) or quotes[:limit]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --------- Internals ---------
+
+    def _rank(self, query: str, limit: int) -> List[Tuple[str, int, float]]:
+        """[(symbol, tier, -score), ...] best first; caller holds the lock."""
+        q = _normalize(query)
+        if not q:
+            return []
+
+        best: Dict[str, Tuple[int, float]] = {}
+        exact = query.strip().upper()
+        if exact in self._entries:
+            best[exact] = (EXACT, 0.0)
+
+        # prefix hits from the sorted key list
+        pos = bisect.bisect_left(self._keys, (q,))
+        end = min(len(self._keys), pos + MAX_PREFIX_CANDIDATES)
+        while pos < end and self._keys[pos][0].startswith(q):
+            _, symbol, tier = self._keys[pos]
+            if symbol not in best or best[symbol][0] > tier:
+                best[symbol] = (tier, 0.0)
+            pos += 1
+
+        # enough prefix hits or too short for trigrams: no fuzzy pass needed
+        if len(q) < 3 or len(best) >= limit:
+            return self._top(best, limit)
+
+        # fuzzy hits: share of the query trigrams found in the entry
+        grams = set().union(*(_trigrams(word) for word in q.split()))
+        counts: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for symbol in self._trigrams.get(gram, ()):
+                counts[symbol] += 1
+        for symbol, shared in counts.items():
+            score = shared / len(grams)
+            if score >= FUZZY_MIN_SCORE and symbol not in best:
+                best[symbol] = (FUZZY, -score)
+
+        return self._top(best, limit)
+
+    @staticmethod
+    def _top(best: Dict[str, Tuple[int, float]], limit: int) -> List[Tuple[str, int, float]]:
+        ranked = sorted(best.items(), key=lambda item: (item[1], len(item[0]), item[0]))
+        return [(symbol, tier, score) for symbol, (tier, score) in ranked[:limit]]
+
+    def _add(
+        self,
+        on_key: Callable[[Tuple[str, str, int]], None],
+        symbol: str,
+        name: Optional[str] = None,
+        exchange: Optional[str] = None,
+        quote_type: Optional[str] = None,
+    ) -> None:
+        # on_key nimmt die Schlüssel auf: einzeln einsortiert (add) oder gesammelt (add_many)
+        symbol = symbol.strip().upper()
+        if not symbol:
+            return
+
+        entry = self._entries.get(symbol)
+        if entry is None:
+            entry = {"symbol": symbol, "shortname": None, "exchange": exchange, "quoteType": quote_type}
+            self._entries[symbol] = entry
+            on_key((_normalize(symbol), symbol, SYMBOL_PREFIX))
+            self._index_words(symbol, _normalize(symbol))
+        else:
+            entry["exchange"] = entry["exchange"] or exchange
+            entry["quoteType"] = entry["quoteType"] or quote_type
+
+        # the first known name is indexed, later ones only fill gaps
+        if name and not entry["shortname"]:
+            entry["shortname"] = name
+            normalized = _normalize(name)
+            on_key((normalized, symbol, NAME_PREFIX))
+            for word in normalized.split()[1:]:
+                on_key((word, symbol, WORD_PREFIX))
+            self._index_words(symbol, normalized)
+
+    def _insert_key(self, item: Tuple[str, str, int]) -> None:
+        pos = bisect.bisect_left(self._keys, item)
+        if pos == len(self._keys) or self._keys[pos] != item:
+            self._keys.insert(pos, item)
+
+    def _index_words(self, symbol: str, text: str) -> None:
+        for word in text.split():
+            for gram in _trigrams(word):
+                self._trigrams[gram].add(symbol)
+
+    def _remote_search(self, query: str, limit: int) -> Optional[List[Dict[str, Optional[str]]]]:
+        """Normalized quotes of the remote search; None if the request failed."""
+        try:
+            result = (self._provider or get_market_data_provider()).search(query, limit)
+        except Exception as e:
+            print(f"Symbol search failed for '{query}': {e}")
+            return None
+
+        quotes = []
+        for quote in result:
+            if not quote.get("symbol"):
+                continue
+            quotes.append({
+                "symbol": quote["symbol"],
+                "shortname": quote.get("shortname") or quote.get("longname"),
+                "exchange": quote.get("exchange"),
+                "quoteType": quote.get("quoteType"),
+            })
+        return quotes
+
+    def _persist(self, quotes: List[Dict[str, Optional[str]]]) -> None:
+        if not quotes:
+            return
+        now = datetime.now().isoformat()
+        with self._get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO search_symbols
+                (symbol, name, exchange, quote_type, added_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [(q["symbol"].upper(), q.get("shortname"), q.get("exchange"), q.get("quoteType"), now) for q in quotes],
+            )
+
+    def _load_persisted(self) -> None:
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT symbol, name, exchange, quote_type FROM search_symbols")
+            rows = cur.fetchall()
+        self.add_many(rows)
+
+    def _load_symbol_list(self, path: str) -> None:
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = [
+                    (row["symbol"], row.get("name"), row.get("exchange"), row.get("quote_type"))
+                    for row in csv.DictReader(f) if row.get("symbol")
+                ]
+            self.add_many(rows)
+        except (OSError, csv.Error) as e:
+            print(f"Could not read symbol list {path}: {e}")
@@ -0,0 +1,237 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+from databaseHandler import connection_pool, run_migrations
+from marketdataprovider import MarketDataProvider
+from resources import get_market_data_provider
+
+MIGRATIONS = [
+    (1, [
+        # one row per symbol, taken from a single ticker info request
+        """
+        CREATE TABLE IF NOT EXISTS ticker_metadata (
+            symbol TEXT PRIMARY KEY,
+            short_name TEXT,
+            long_name TEXT,
+            currency TEXT,
+            quote_type TEXT,           -- e.g. 'EQUITY', 'ETF', 'CRYPTOCURRENCY'
+            exchange TEXT,
+            fetched_at TIMESTAMP NOT NULL
+        );
+        """,
+    ]),
+    (2, [
+        # IANA timezone of the exchange, e.g. 'Australia/Sydney'
+        "ALTER TABLE ticker_metadata ADD COLUMN timezone TEXT",
+        # existing rows have no timezone yet: mark them stale, so the next get() refreshes them
+        "UPDATE ticker_metadata SET fetched_at = '2000-01-01T00:00:00'",
+    ]),
+]
+
+
+class TickerMetadata:
+    __slots__ = ("symbol", "short_name", "long_name", "currency", "quote_type", "exchange", "fetched_at", "timezone")
+
+    def __init__(self, symbol, short_name, long_name, currency, quote_type, exchange, fetched_at: datetime,
+                 timezone: Optional[str] = None) -> None:
+        self.symbol = symbol
+        self.short_name = short_name
+        self.long_name = long_name
+        self.currency = currency
+        self.quote_type = quote_type
+        self.exchange = exchange
+        self.fetched_at = fetched_at
+        self.timezone = timezone
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.short_name or self.long_name
+
+
+class TickerMetadataStore:
+    """
+    Name, currency, quote type, exchange and exchange timezone per symbol.
+
+    The ``info`` payload of a symbol is fetched once and kept in SQLite plus
+    an in-memory LRU. Entries older than ``ttl`` are still served; a refresh
+    is started in the background, so callers never wait for a stale entry.
+    Failed or empty lookups are remembered for ``miss_ttl``, so unknown or
+    delisted symbols do not cause a request on every call.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "tickermeta.db",
+        ttl: timedelta = timedelta(days=7),
+        max_entries: int = 2000,
+        provider: Optional[MarketDataProvider] = None,
+        miss_ttl: timedelta = timedelta(minutes=15),
+    ) -> None:
+        self.db_path = db_path
+        self.provider = provider or get_market_data_provider()
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, TickerMetadata]" = OrderedDict()
+        self._misses: "OrderedDict[str, datetime]" = OrderedDict()   # symbol -> time of the failed lookup
+        self._lock = threading.Lock()
+        self._refreshing: Set[str] = set()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ticker_metadata")
+        run_migrations(self.db_path, MIGRATIONS)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        return connection_pool.get(self.db_path)
+
+    # --------- Public API ---------
+
+    def get(self, symbol: str) -> Optional[TickerMetadata]:
+        """Metadata of the symbol; None if it was never fetched successfully."""
+        symbol = symbol.strip().upper()
+        if not symbol:
+            return None
+
+        meta = self._from_memory(symbol) or self._from_db(symbol)
+        if meta is None:
+            if self._recent_miss(symbol):
+                return None
+            return self._fetch(symbol)
+
+        if datetime.now() - meta.fetched_at > self.ttl:
+            self._refresh_in_background(symbol)
+        return meta
+
+    def name(self, symbol: str) -> Optional[str]:
+        meta = self.get(symbol)
+        return meta.name if meta else None
+
+    def long_name(self, symbol: str) -> Optional[str]:
+        meta = self.get(symbol)
+        return (meta.long_name or meta.short_name) if meta else None
+
+    def currency(self, symbol: str) -> Optional[str]:
+        meta = self.get(symbol)
+        return meta.currency if meta else None
+
+    def quote_type(self, symbol: str) -> Optional[str]:
+        meta = self.get(symbol)
+        return meta.quote_type if meta else None
+
+    def timezone(self, symbol: str) -> Optional[str]:
+        meta = self.get(symbol)
+        return meta.timezone if meta else None
+
+    def close(self) -> None:
+        self._refresher.shutdown(wait=False, cancel_futures=True)
+
+    # --------- Internals ---------
+
+    def _from_memory(self, symbol: str) -> Optional[TickerMetadata]:
+        with self._lock:
+            meta = self._memory.get(symbol)
+            if meta is not None:
+                self._memory.move_to_end(symbol)
+            return meta
+
+    def _remember(self, meta: TickerMetadata) -> None:
+        with self._lock:
+            self._memory[meta.symbol] = meta
+            self._memory.move_to_end(meta.symbol)
+            self._misses.pop(meta.symbol, None)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _recent_miss(self, symbol: str) -> bool:
+        with self._lock:
+            missed_at = self._misses.get(symbol)
+            if missed_at is None:
+                return False
+            if datetime.now() - missed_at < self.miss_ttl:
+                return True
+            del self._misses[symbol]
+            return False
+
+    def _remember_miss(self, symbol: str) -> None:
+        with self._lock:
+            self._misses[symbol] = datetime.now()
+            self._misses.move_to_end(symbol)
+            while len(self._misses) > self.max_entries:
+                self._misses.popitem(last=False)
+
+    def _from_db(self, symbol: str) -> Optional[TickerMetadata]:
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """
+                SELECT symbol, short_name, long_name, currency, quote_type, exchange, fetched_at, timezone
+                FROM ticker_metadata
+                WHERE symbol = ?
+                """,
+                (symbol,),
+            )
+            row = cur.fetchone()
+        if row is None:
+            return None
+
+        meta = TickerMetadata(*row[:6], datetime.fromisoformat(row[6]), row[7])
+        self._remember(meta)
+        return meta
+
+    def _fetch(self, symbol: str) -> Optional[TickerMetadata]:
+        try:
+            info = self.provider.info(symbol)
+        except Exception as e:
+            # only a short-lived miss is stored, the next call after miss_ttl tries again
+            print(f"Metadata request failed for {symbol}: {e}")
+            self._remember_miss(symbol)
+            return None
+
+        if not info:
+            self._remember_miss(symbol)
+            return None
+
+        meta = TickerMetadata(
+            symbol,
+            info.get("shortName"),
+            info.get("longName"),
+            info.get("currency"),
+            info.get("quoteType"),
+            info.get("exchange"),
+            datetime.now(),
+            info.get("exchangeTimezoneName"),
+        )
+        with self._get_connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO ticker_metadata
+                (symbol, short_name, long_name, currency, quote_type, exchange, fetched_at, timezone)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (meta.symbol, meta.short_name, meta.long_name, meta.currency,
+                 meta.quote_type, meta.exchange, meta.fetched_at.isoformat(), meta.timezone),
+            )
+        self._remember(meta)
+        return meta
+
+    def _refresh_in_background(self, symbol: str) -> None:
+        with self._lock:
+            if symbol in self._refreshing:
+                return
+            self._refreshing.add(symbol)
+
+        def refresh():
+            try:
+                self._fetch(symbol)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(symbol)
+
+        try:
+            self._refresher.submit(refresh)
+        except RuntimeError:
+            # executor already shut down (interpreter exit)
+            with self._lock:
+                self._refreshing.discard(symbol)
@@ -0,0 +1,89 @@
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from fxrates import FxRateStore
+from marketdatacache import MarketDataCache
+from resources import get_fx_rate_store, get_market_data_cache, get_ticker_metadata
+from tickermetadata import TickerMetadataStore
+from portfolio import Portfolio
+
+
+class PortfolioValuation:
+    """
+    Mark-to-market result of one portfolio, all amounts in EUR.
+
+    ``lots`` has one row per asset row of the portfolio, ``holdings`` one
+    row per symbol with its share of the total market value (``weight``).
+    Lots without a current quote have NaN values and are left out of the totals.
+    """
+
+    def __init__(self, lots: pd.DataFrame, holdings: pd.DataFrame) -> None:
+        self.lots = lots
+        self.holdings = holdings
+        self.market_value = float(np.nansum(holdings["market_value"].to_numpy()))
+        self.cost_basis = float(holdings["cost_basis"].sum())
+        priced_cost = float(holdings.loc[holdings["market_value"].notna(), "cost_basis"].sum())
+        self.unrealized_pnl = self.market_value - priced_cost
+        self.unrealized_pnl_pct = self.unrealized_pnl / priced_cost * 100 if priced_cost else 0.0
+
+
+def value_portfolio(
+    portfolio: Portfolio,
+    market_data: Optional[MarketDataCache] = None,
+    fx: Optional[FxRateStore] = None,
+    metadata: Optional[TickerMetadataStore] = None,
+) -> PortfolioValuation:
+    """
+    Values every lot of the portfolio at the current price.
+    One multi-ticker quote request for all distinct symbols, one FX lookup,
+    the rest are NumPy vector operations over the lots.
+    """
+    market_data = market_data or get_market_data_cache()
+    fx = fx or get_fx_rate_store()
+    metadata = metadata or get_ticker_metadata()
+
+    # columns of the portfolio; symbol categories are already distinct and sorted
+    codes = portfolio.symbol_codes
+    unique_symbols = np.array(portfolio.symbols, dtype=object)
+    symbols = unique_symbols[codes]
+    amounts = portfolio.amounts
+    buy_prices = portfolio.buy_prices
+
+    quotes = market_data.get_quotes(list(unique_symbols))
+    prices = np.array([quotes.get(s, np.nan) for s in unique_symbols], dtype=float)
+    currencies = [metadata.currency(s) or "EUR" for s in unique_symbols]
+    prices_eur = fx.convert_to_eur(prices, currencies, [date.today()] * len(unique_symbols))
+
+    lot_price = prices_eur[codes]
+    market_value = amounts * lot_price
+    cost_basis = amounts * buy_prices
+
+    # aggregate per symbol; NaN stays NaN if the symbol has no quote
+    symbol_amount = np.bincount(codes, weights=amounts, minlength=len(unique_symbols))
+    symbol_cost = np.bincount(codes, weights=cost_basis, minlength=len(unique_symbols))
+    symbol_value = symbol_amount * prices_eur
+    total = np.nansum(symbol_value)
+    weights = symbol_value / total if total else np.zeros_like(symbol_value)
+
+    lots = pd.DataFrame({
+        "symbol": symbols,
+        "amount": amounts,
+        "buy_price": buy_prices,
+        "price": lot_price,
+        "cost_basis": cost_basis,
+        "market_value": market_value,
+        "unrealized_pnl": market_value - cost_basis,
+    })
+    holdings = pd.DataFrame({
+        "symbol": unique_symbols,
+        "amount": symbol_amount,
+        "price": prices_eur,
+        "cost_basis": symbol_cost,
+        "market_value": symbol_value,
+        "unrealized_pnl": symbol_value - symbol_cost,
+        "weight": weights,
+    })
+    return PortfolioValuation(lots, holdings)